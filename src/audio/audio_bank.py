@@ -0,0 +1,92 @@
+import json, mmap, struct, zlib
+from dataclasses import dataclass
+from pathlib import Path
+
+BANK_SRC = "assets/audio/sfx.bank"
+MAGIC = b"FPAB"
+VERSION = 1
+# ? Magic, version, frequency, size (signed bits), channels, index length
+HEADER = struct.Struct("<4sHIhHI")
+
+
+@dataclass(frozen=True, slots=True)
+class BankEntry:
+    offset: int     # From the start of the data section
+    length: int     # Stored length
+    raw_length: int # PCM length, once decompressed
+    compressed: bool
+
+class AudioBank:
+    """
+    A packed bank of sounds (see `tools/build_audio_bank.py`), memory-mapped once.\n
+    The sounds are stored as raw PCM in the mixer's sample format, so they can be handed
+    straight to `pygame.mixer.Sound(buffer=...)`. Uncompressed sounds are served as slices
+    of the mapped file, without copying them. Keys are the SFX paths (i.e.: `assets/audio/sfx/grunt.wav`).
+    """
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.frequency, self.size, self.channels, index_length = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"Unsupported audio bank: {self.path}")
+        index_start = HEADER.size
+        self._data_start = index_start + index_length
+        index: dict[str, list] = json.loads(self._map[index_start:self._data_start])
+        self._entries: dict[str, BankEntry] = {key: BankEntry(*value) for key, value in index.items()}
+
+    @classmethod
+    def open(cls, path: str | Path) -> "AudioBank | None":
+        """Returns the bank at `path`, or `None` if it doesn't exist or is invalid."""
+        try: return cls(path)
+        except (OSError, ValueError, struct.error): return None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def matches(self, frequency: int, size: int, channels: int) -> bool:
+        """Returns `True` if the bank's PCM is in the given mixer format (see `pygame.mixer.get_init()`)."""
+        return (self.frequency, self.size, self.channels) == (frequency, size, channels)
+
+    def get_buffer(self, key: str) -> memoryview | bytes:
+        """Returns the PCM of `key`. A `KeyError` is raised if it's not in the bank."""
+        entry = self._entries[key]
+        start = self._data_start + entry.offset
+        data = memoryview(self._map)[start:start + entry.length]
+        return zlib.decompress(data) if entry.compressed else data
+
+    def close(self):
+        # ? Buffers still referencing the map keep it open, it's then closed with them
+        try: self._map.close()
+        except BufferError: pass
+        self._file.close()
+
+def write_bank(
+    path: str | Path, sounds: dict[str, bytes], frequency: int, size: int, channels: int,
+    *, compress: bool = False
+) -> int:
+    """
+    Writes `sounds` (key -> raw PCM) as an audio bank. Returns the size of the bank.\n
+    With `compress`, sounds are zlib compressed if it saves at least 10% of their size.
+    """
+    index: dict[str, tuple[int, int, int, bool]] = {}
+    blobs: list[bytes] = []
+    offset = 0
+    for key, pcm in sounds.items():
+        blob, compressed = pcm, False
+        if compress:
+            packed = zlib.compress(pcm, 9)
+            if len(packed) < len(pcm) * 0.9: blob, compressed = packed, True
+        index[key] = (offset, len(blob), len(pcm), compressed)
+        blobs.append(blob)
+        offset += len(blob)
+    index_bytes = json.dumps(index, separators=(",", ":")).encode()
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, frequency, size, channels, len(index_bytes)))
+        file.write(index_bytes)
+        for blob in blobs: file.write(blob)
+    return HEADER.size + len(index_bytes) + offset
@@ -1,9 +1,17 @@
-import pygame, os
+import os
 from pathlib import Path
+from typing import Iterable
 
-from utilities.file_management import get_asset_path
+from audio.audio_bank import AudioBank, BANK_SRC
+from audio.sfx_arbiter import SFXArbiter
+from audio.sfx_data import RATE_CAPS
+from utilities.file_management import get_asset_path, resolver
+from utilities.lazy_import import lazy_import
 from utilities.values import clamp
 
+# ? Only loaded once the mixer is initialized
+pygame = lazy_import("pygame")
+
 
 # TODO: Add more features for the AudioManager class
 class AudioManager:
@@ -12,15 +20,20 @@ class AudioManager:
         self, music_volume: float = 0.3,
         sfx_volume: float = 0.5,
         directional_sfx: bool = True,
-        *, debug: bool = True
+        *, arbitrate: bool = True, debug: bool = True
     ):
         self.music_volume = music_volume
         self.sfx_volume = sfx_volume
         self.directional_sfx = directional_sfx
         self.debug = debug
+        self.initialized: bool = False
         
         # Optimization: Cache loaded sounds so we don't read from disk every time
         self._sfx_cache: dict[Path, pygame.mixer.Sound] = {}
+        # ? Packed SFX (see `tools/build_audio_bank.py`), loose files are used without it
+        self._bank: AudioBank = None
+        # ? Merges the identical SFX requested on a same frame, and caps their rates
+        self.arbiter: SFXArbiter = SFXArbiter(self.play_sfx_now, rate_caps=RATE_CAPS) if arbitrate else None
     
     def _debug_msg(self, msg: str):
         if self.debug:
@@ -33,17 +46,39 @@ class AudioManager:
         os.environ['SDL_AUDIODRIVER'] = 'directsound'
         # ? If 'directsound' fails, try 'winmm'
         try:
-            pygame.mixer.pre_init(channels=2)
+            bank = AudioBank.open(get_asset_path(BANK_SRC))
+            # ? The mixer is asked for the bank's format, packaged builds don't ship the loose SFX
+            if bank is not None: pygame.mixer.pre_init(bank.frequency, bank.size, bank.channels)
+            else: pygame.mixer.pre_init(channels=2)
             pygame.mixer.init()
             freq, size, channels = pygame.mixer.get_init()
             self._debug_msg(f"MIXER STATUS: Frequency={freq}, Size={size}, Channels={channels}")
+            if bank is not None: self._use_bank(bank, freq, size, channels)
             pygame.mixer.music.set_volume(self.music_volume)
+            self.initialized = True
             self._debug_msg("Successfully initialized pygame.mixer")
         except Exception as e:
             self._debug_msg(f"Error initializing pygame.mixer: {e}")
     
+    def _use_bank(self, bank: AudioBank, frequency: int, size: int, channels: int):
+        """Uses the audio bank, if its PCM is in the mixer's format."""
+        if not bank.matches(frequency, size, channels):
+            print(f"[AudioManager] Ignoring the audio bank, it's in another format ({bank.frequency}Hz, {bank.size}-bit, {bank.channels}ch)")
+            bank.close()
+            return
+        self._bank = bank
+        self._debug_msg(f"Opened the audio bank: {len(bank)} sound(s)")
+    
+    def _load_sound(self, sfx_path: Path) -> "pygame.mixer.Sound":
+        """Loads an SFX from the audio bank, or from its file if it's not in the bank (or is overridden)."""
+        key = sfx_path.as_posix()
+        if self._bank is not None and key in self._bank and not resolver.override(key):
+            return pygame.mixer.Sound(buffer=self._bank.get_buffer(key))
+        return pygame.mixer.Sound(get_asset_path(key))
+    
     def play_music(self, music_path: Path):
-        """Plays music that is on loop."""
+        """Plays music that is on loop. Blocks while it's loaded, the game uses the `MusicStreamer`."""
+        if not self.initialized: return
         try:
             music_path = get_asset_path(music_path)
             self._debug_msg(f"Playing music: {music_path}")
@@ -61,19 +96,25 @@ class AudioManager:
         """
         Use the `SFXLibrary` dataclass for supplying the `sfx_path`.\n
         If `directional_sfx` is `True`, then audio panning will work.\n
-        Audio panning will only work if `left_volume` and `right_volume` is provided.
+        Audio panning will only work if `left_volume` and `right_volume` is provided.\n
+        With the `arbiter`, identical SFX requested within its window are played once.
         """
+        if not self.initialized: return # ? The mixer is still being initialized
+        volume = self.sfx_volume if base_volume is None else base_volume
+        if self.arbiter is not None: self.arbiter.request(sfx_path, volume, left_volume, right_volume)
+        else: self.play_sfx_now(sfx_path, left_volume, right_volume, volume)
+    
+    def play_sfx_now(self, sfx_path: Path, left_volume: float, right_volume: float, volume: float):
+        """Plays an SFX right away, bypassing the `arbiter` (i.e.: for SFX already merged, see `SpatialAudio`)."""
+        if not self.initialized: return
         try:
             # Load Sound (with basic caching)
-            if sfx_path not in self._sfx_cache:
-                sfx_path = get_asset_path(sfx_path.as_posix())
-                self._sfx_cache[sfx_path] = pygame.mixer.Sound(sfx_path)
-            
-            sound = self._sfx_cache[sfx_path]
+            sound = self._sfx_cache.get(sfx_path)
+            if sound is None: sound = self._sfx_cache[sfx_path] = self._load_sound(sfx_path)
             
             # Apply Master Volume
             # We set this on the sound object itself so it scales appropriately
-            sound.set_volume(self.sfx_volume if base_volume is None else base_volume)
+            sound.set_volume(volume)
             
             # Play to get a Channel
             channel = sound.play()
@@ -89,4 +130,12 @@ class AudioManager:
                 self._debug_msg(f"Played SFX (Center)")
                     
         except Exception as e:
-            self._debug_msg(f"Failed to play SFX: {e}")
\ No newline at end of file
+            self._debug_msg(f"Failed to play SFX: {e}")
+    
+    def preload_sfx(self, sfx_paths: Iterable[Path]):
+        """Loads the SFX into the cache ahead of time. Safe to run in a background thread."""
+        if not self.initialized: return
+        for sfx_path in sfx_paths:
+            if sfx_path in self._sfx_cache: continue
+            try: self._sfx_cache[sfx_path] = self._load_sound(sfx_path)
+            except Exception as e: self._debug_msg(f"Failed to preload SFX: {e}")
@@ -1,5 +1,8 @@
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Iterator
+
+from utilities.file_management import resolver
 
 
 _MUSIC_DIR = Path("assets") / "audio" / "music"
@@ -15,8 +18,19 @@ class Ambience:
 @dataclass
 class Other:
     bossa_brasil = music_path("summer-samba_world-music-bossa-brasil")
-    dreams = music_path("lost-sky_dreams-ncs")
 
 # * Main Sound Library
 class MusicLibrary:
-    ambience = Ambience()
\ No newline at end of file
+    ambience = Ambience()
+    other = Other()
+
+def all_music() -> Iterator[Path]:
+    """Yields the `Path` of every track in the `MusicLibrary`."""
+    for group in vars(MusicLibrary).values():
+        if not hasattr(group, "__dataclass_fields__"): continue
+        for value in vars(type(group)).values():
+            if isinstance(value, Path): yield value
+
+def validate_library() -> list[Path]:
+    """Returns the tracks of the `MusicLibrary` whose files are missing."""
+    return [path for path in all_music() if not resolver.exists(path)]
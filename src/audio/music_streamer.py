@@ -0,0 +1,188 @@
+import asyncio
+from collections import OrderedDict
+from enum import Enum
+from pathlib import Path
+
+from audio.audio_manager import AudioManager
+from audio.music_data import validate_library
+from utilities.file_management import get_asset_path
+from utilities.lazy_import import lazy_import
+from utilities.tasks import attempt_cancel
+
+pygame = lazy_import("pygame")
+
+
+# ? Bitrates (kbps) of MPEG-1 Layer III frames, by their header's bitrate index
+MP3_BITRATES = (None, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, None)
+
+def estimate_mp3_duration(path: str | Path) -> float | None:
+    """
+    Estimates the duration (in seconds) of an MP3 from the bitrate of its first frame, without
+    decoding it. Exact for constant bitrates. `None` if it's not an MPEG-1 Layer III file.
+    """
+    path = Path(path)
+    with open(path, "rb") as file:
+        tag = file.read(10)
+        # ? Skips the ID3v2 tag, its size is stored as 4 "syncsafe" (7-bit) bytes
+        offset = 10 + sum((b & 0x7F) << (7 * (3 - i)) for i, b in enumerate(tag[6:10])) if tag[:3] == b"ID3" else 0
+        file.seek(offset)
+        data = file.read(4096)
+    for i in range(len(data) - 2):
+        if data[i] != 0xFF or data[i + 1] & 0xFE != 0xFA: continue
+        bitrate = MP3_BITRATES[data[i + 2] >> 4]
+        if bitrate is None: return None
+        return (path.stat().st_size - offset - i) * 8 / (bitrate * 1000)
+    return None
+
+class Mood(Enum):
+    AMBIENCE = "ambience"
+    COMBAT = "combat"
+
+class MusicStreamer:
+    """
+    Plays the music on two reserved mixer channels, and `pygame.mixer.music`, so tracks can crossfade.\n
+    Each mood (see `Mood`) has its track, and `set_mood()` crossfades to it once started. A track
+    is either decoded to PCM on a background thread ahead of time (see `preload()`), and played on
+    a channel, or streamed with `pygame.mixer.music`. The fades are run by the mixer itself, so
+    changing tracks never stalls the event loop.\n
+    Decoded PCM costs ~10 MB per minute (44.1kHz, 16-bit stereo), so the decoded tracks share a
+    budget of `max_decoded_mb`. A track is only decoded if its estimated PCM size fits in it (the
+    least recently used tracks are evicted, never the playing one), otherwise it's streamed. Two
+    decoded tracks, or a decoded and a streamed one, crossfade. Two streamed ones can't, the
+    outgoing one fades out first.
+    """
+    CHANNELS = 2
+
+    def __init__(self, audio_manager: AudioManager, *, fade: float = 1.5, max_decoded_mb: float = 48):
+        self.audio_manager = audio_manager
+        self.fade = fade
+        self.max_decoded_mb = max_decoded_mb
+        self.tracks: dict[Mood, Path] = {}
+        self.mood: Mood = None
+        self._channels: list["pygame.mixer.Channel"] = []
+        self._current: int = 0
+        self._playing: Path = None
+        self._streaming: bool = False
+        self._decoded: OrderedDict[Path, "pygame.mixer.Sound"] = OrderedDict()
+        # ? Track -> PCM size (in bytes) of the decoded tracks, and of the ones being decoded
+        self._decoded_sizes: dict[Path, int] = {}
+        self._decoding: dict[Path, asyncio.Task] = {}
+        self._switch_task: asyncio.Task = None
+        self._mood_handle: asyncio.TimerHandle = None
+
+    @property
+    def fade_ms(self) -> int: return int(self.fade * 1000)
+
+    def start(self, tracks: dict[Mood, Path], mood: Mood = Mood.AMBIENCE):
+        """
+        Validates the music library, reserves the channels and plays the track of `mood`.
+        The tracks of the other moods are preloaded after it. Requires an initialized mixer.
+        """
+        if not self.audio_manager.initialized: return
+        missing = set(validate_library())
+        for path in missing: self.audio_manager._debug_msg(f"Missing music track: {path}")
+        self.tracks = {key: path for key, path in tracks.items() if path not in missing}
+        pygame.mixer.set_reserved(self.CHANNELS)
+        self._channels = [pygame.mixer.Channel(i) for i in range(self.CHANNELS)]
+        self.set_mood(mood)
+        for path in self.tracks.values():
+            if path != self.tracks.get(mood): self.preload(path)
+
+    def set_mood(self, mood: Mood, *, delay: float = 0):
+        """Crossfades to the track of `mood`, after `delay` seconds. A newer call replaces a pending one."""
+        if self._mood_handle is not None: self._mood_handle.cancel()
+        self._mood_handle = None
+        if delay > 0:
+            self._mood_handle = asyncio.get_running_loop().call_later(delay, self.set_mood, mood)
+            return
+        if mood == self.mood or not self._channels: return
+        self.mood = mood
+        path = self.tracks.get(mood)
+        if path is None: return
+        attempt_cancel(self._switch_task)
+        self._switch_task = asyncio.create_task(self._switch(path), name="music_switch")
+
+    def preload(self, path: Path) -> asyncio.Task:
+        """Decodes `path` on a background thread, unless it's already decoded (or being decoded)."""
+        task = self._decoding.get(path)
+        if task is None: task = self._decoding[path] = asyncio.create_task(self._decode(path))
+        return task
+
+    def _pcm_size(self, path: Path) -> int | None:
+        """Returns the estimated size (in bytes) of `path` once decoded in the mixer's format, `None` if unknown."""
+        try: duration = estimate_mp3_duration(get_asset_path(path))
+        except OSError: return None
+        if duration is None: return None
+        frequency, size, channels = pygame.mixer.get_init()
+        return int(duration * frequency * channels * abs(size) // 8)
+
+    def _make_room(self, size: int) -> bool:
+        """Evicts the least recently used decoded tracks (never the playing one) until `size` bytes fit in the budget."""
+        budget = self.max_decoded_mb * 1024 * 1024
+        if size > budget: return False
+        for key in list(self._decoded):
+            if sum(self._decoded_sizes.values()) + size <= budget: break
+            if key == self._playing: continue
+            del self._decoded[key]
+            self._decoded_sizes.pop(key, None)
+        return sum(self._decoded_sizes.values()) + size <= budget
+
+    async def _decode(self, path: Path) -> "pygame.mixer.Sound | None":
+        sound = self._decoded.get(path)
+        if sound is not None:
+            self._decoded.move_to_end(path)
+            return sound
+        try:
+            size = self._pcm_size(path)
+            if size is None or not self._make_room(size):
+                self.audio_manager._debug_msg(f"{path} doesn't fit in the decoded budget, it will be streamed")
+                return None
+            self._decoded_sizes[path] = size # ? Reserved while decoding
+            try: sound = await asyncio.to_thread(pygame.mixer.Sound, get_asset_path(path))
+            except Exception as e: self.audio_manager._debug_msg(f"Couldn't decode {path}, it will be streamed: {e}")
+            finally:
+                if sound is None: self._decoded_sizes.pop(path, None) # ? Failed, or cancelled
+        finally: self._decoding.pop(path, None)
+        if sound is None: return None
+        frequency, size, channels = pygame.mixer.get_init()
+        self._decoded_sizes[path] = int(sound.get_length() * frequency * channels * abs(size) // 8)
+        self._decoded[path] = sound
+        return sound
+
+    async def _switch(self, path: Path):
+        if path == self._playing: return
+        # ? Shielded, a newer switch shouldn't throw away the decoding
+        sound = await asyncio.shield(self.preload(path))
+        if sound is None: return await self._stream(path)
+        if self._streaming:
+            pygame.mixer.music.fadeout(self.fade_ms)
+            self._streaming = False
+        self._channels[self._current].fadeout(self.fade_ms)
+        self._current = (self._current + 1) % self.CHANNELS
+        sound.set_volume(self.audio_manager.music_volume)
+        self._channels[self._current].play(sound, loops=-1, fade_ms=self.fade_ms)
+        self._playing = path
+        self.audio_manager._debug_msg(f"Crossfading to music: {path}")
+
+    async def _stream(self, path: Path):
+        """Fallback for the tracks that can't be decoded, loaded on a background thread."""
+        for channel in self._channels: channel.fadeout(self.fade_ms)
+        if self._streaming:
+            pygame.mixer.music.fadeout(self.fade_ms)
+            await asyncio.sleep(self.fade)
+        await asyncio.to_thread(pygame.mixer.music.load, get_asset_path(path))
+        pygame.mixer.music.set_volume(self.audio_manager.music_volume)
+        pygame.mixer.music.play(-1, fade_ms=self.fade_ms)
+        self._streaming = True
+        self._playing = path
+        self.audio_manager._debug_msg(f"Streaming music: {path}")
+
+    def stop(self):
+        """Fades out the music, and cancels the pending switches and decodings."""
+        if self._mood_handle is not None: self._mood_handle.cancel()
+        attempt_cancel(self._switch_task)
+        for task in list(self._decoding.values()): attempt_cancel(task)
+        for channel in self._channels: channel.fadeout(self.fade_ms)
+        if self._streaming: pygame.mixer.music.fadeout(self.fade_ms)
+        self.mood = self._playing = None
+        self._streaming = False
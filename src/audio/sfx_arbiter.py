@@ -0,0 +1,105 @@
+import asyncio, math, time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+
+@dataclass(slots=True)
+class MergedRequest:
+    """The requests of a same SFX within a window. Pans are summed weighted by volume, to be averaged."""
+    energy: float = 0.0
+    left: float = 0.0
+    right: float = 0.0
+    panned_volume: float = 0.0
+    count: int = 0
+
+    def add(self, volume: float, left: float = None, right: float = None):
+        self.energy += volume * volume
+        self.count += 1
+        if left is None or right is None: return
+        self.left += left * volume
+        self.right += right * volume
+        self.panned_volume += volume
+
+    @property
+    def volume(self) -> float:
+        """The combined volume, summed as uncorrelated sources would (and capped to 1)."""
+        return min(math.sqrt(self.energy), 1.0)
+
+    @property
+    def pan(self) -> tuple[float | None, float | None]:
+        """The volume weighted average of the pans, `(None, None)` if no request was panned."""
+        if not self.panned_volume: return None, None
+        return self.left / self.panned_volume, self.right / self.panned_volume
+
+@dataclass(slots=True)
+class ArbiterStats:
+    requested: int = 0
+    played: int = 0
+    merged: int = 0
+    limited: int = 0
+
+class SFXArbiter:
+    """
+    Merges the identical SFX requested within `window` seconds into a single play, with their
+    combined volume and averaged pan (i.e.: a horde's footsteps on the same frame). Plays of an SFX
+    are also capped to `rate_caps[sfx]` per second (`default_rate` if it's not listed, `None` for
+    no cap), requests over it are dropped.
+    """
+    def __init__(
+        self, play: Callable[[Path, float, float, float], None],
+        *, window: float = 1 / 60, rate_caps: dict[Path, float] = None, default_rate: float = None
+    ):
+        self.play = play
+        self.window = window
+        self.rate_caps: dict[Path, float] = dict(rate_caps or {})
+        self.default_rate = default_rate
+        self.stats = ArbiterStats()
+        self._pending: dict[Path, MergedRequest] = {}
+        self._last_played: dict[Path, float] = {}
+        self._flush_handle: asyncio.TimerHandle = None
+
+    def request(self, sfx: Path, volume: float, left: float = None, right: float = None):
+        """Queues `sfx` to be played at the end of the window, merged with the identical requests."""
+        self.stats.requested += 1
+        if self._is_limited(sfx):
+            self.stats.limited += 1
+            return
+        merged = self._pending.get(sfx)
+        if merged is None: merged = self._pending[sfx] = MergedRequest()
+        else: self.stats.merged += 1
+        merged.add(volume, left, right)
+        if self._flush_handle is not None: return
+        try: self._flush_handle = asyncio.get_running_loop().call_later(self.window, self.flush)
+        except RuntimeError: self.flush() # ? No running loop, play right away
+
+    def _is_limited(self, sfx: Path) -> bool:
+        if sfx in self._pending: return False # ? Merged, it doesn't add a play
+        return self.is_limited(sfx)
+
+    def is_limited(self, sfx: Path, now: float = None) -> bool:
+        """Returns `True` if `sfx` was played too recently, according to its rate cap."""
+        rate = self.rate_caps.get(sfx, self.default_rate)
+        last = self._last_played.get(sfx)
+        if not rate or last is None: return False
+        return (time.perf_counter() if now is None else now) - last < 1 / rate
+
+    def record_play(self, sfx: Path, now: float = None):
+        """Counts a play of `sfx` against its rate cap, for the plays merged elsewhere (see `SpatialAudio`)."""
+        self._last_played[sfx] = time.perf_counter() if now is None else now
+        self.stats.played += 1
+
+    def flush(self):
+        """Plays the merged requests."""
+        self._flush_handle = None
+        pending, self._pending = self._pending, {}
+        now = time.perf_counter()
+        for sfx, merged in pending.items():
+            left, right = merged.pan
+            self.record_play(sfx, now)
+            self.play(sfx, left, right, merged.volume)
+
+    def clear(self):
+        if self._flush_handle is not None: self._flush_handle.cancel()
+        self._flush_handle = None
+        self._pending.clear()
@@ -1,5 +1,6 @@
 from pathlib import Path
 from dataclasses import dataclass
+from typing import Iterator
 
 
 _SFX_DIR = Path("assets") / "audio" / "sfx"
@@ -88,4 +89,20 @@ class SFXLibrary:
     enemy = EnemySFX()
     footsteps = FootstepsSFX()
     impacts = ImpactsSFX()
-    
\ No newline at end of file
+    
+
+# ? Max plays per second of the SFX that a horde plays at once (see `SFXArbiter`), the listener's own aren't capped
+RATE_CAPS: dict[Path, float] = {
+    FootstepsSFX.footstep_grass_1: 8,
+    FootstepsSFX.footstep_grass_2: 8,
+    EnemySFX.goblin_hurt: 6,
+    ImpactsSFX.flesh_impact_1: 8,
+    ImpactsSFX.flesh_impact_2: 8,
+}
+
+def all_sfx() -> Iterator[Path]:
+    """Yields the `Path` of every SFX in the `SFXLibrary`."""
+    for group in vars(SFXLibrary).values():
+        if not hasattr(group, "__dataclass_fields__"): continue
+        for value in vars(type(group)).values():
+            if isinstance(value, Path): yield value
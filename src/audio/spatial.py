@@ -0,0 +1,135 @@
+import asyncio, math, time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Hashable
+
+import flet as ft
+
+from audio.audio_manager import AudioManager
+from audio.sfx_arbiter import MergedRequest
+
+
+@dataclass(slots=True)
+class Emission:
+    """An SFX waiting for the next spatial pass. `x` is the emitter's center, in page pixels."""
+    sfx: Path
+    x: float
+    volume: float
+    emitter: Hashable = None
+
+@dataclass(frozen=True, slots=True)
+class SpatialParams:
+    """
+    The falloff and panning model.\n
+    The gain is `1` up to `ref_distance`, then follows an inverse distance rolloff, and is `0`
+    past `max_distance`. Emitters are fully panned at `pan_width` (or half the page's width).
+    """
+    ref_distance: float = 150
+    max_distance: float = 1200
+    rolloff: float = 1.0
+    pan_width: float = None
+
+class SpatialAudio:
+    """
+    Positions the SFX relative to a listener, the player or the camera (center of the page).\n
+    SFX emitted during a frame are queued, then the pan and attenuation of all of them are
+    computed in a single pass. Inaudible SFX (under `min_gain`) are culled before reaching the
+    mixer, and the identical ones are merged (as the audio manager's `SFXArbiter` does, whose rate
+    caps apply too, except to the listener's own SFX). Only the `max_voices` loudest of a frame are
+    then played, straight away, so far away hordes don't use up the mixer's channels.
+    """
+    def __init__(
+        self, audio_manager: AudioManager, page: ft.Page, params: SpatialParams = None,
+        *, frame_time: float = 1 / 60, min_gain: float = 0.03, max_voices: int = 6
+    ):
+        self.audio_manager = audio_manager
+        self.page = page
+        self.params = params if params is not None else SpatialParams()
+        self.frame_time = frame_time
+        self.min_gain = min_gain
+        self.max_voices = max_voices
+        self._listener: Callable[[], float] = None
+        self._listener_emitter: Hashable = None
+        self._pending: list[Emission] = []
+        self._flush_handle: asyncio.TimerHandle = None
+        # ? Lifetime stats, to tune the model
+        self.played: int = 0
+        self.culled: int = 0
+        self.merged: int = 0
+        self.limited: int = 0
+
+    def set_listener(self, listener: Callable[[], float] = None, *, emitter: Hashable = None):
+        """
+        Sets the function returning the listener's x (in page pixels). `None` listens from the camera.\n
+        The SFX of `emitter` (i.e.: the player) are the listener's own, they're never rate capped.
+        """
+        self._listener = listener
+        self._listener_emitter = emitter
+
+    def listener_x(self) -> float:
+        if self._listener is not None: return self._listener()
+        return (self.page.width or 0) / 2
+
+    def emit(self, sfx: Path, x: float, volume: float = None, *, emitter: Hashable = None):
+        """Queues `sfx`, emitted at `x` (by `emitter`), to be played on the next frame."""
+        if not self.audio_manager.initialized: return
+        volume = self.audio_manager.sfx_volume if volume is None else volume
+        self._pending.append(Emission(sfx, x, volume, emitter))
+        if self._flush_handle is not None: return
+        try: self._flush_handle = asyncio.get_running_loop().call_later(self.frame_time, self.flush)
+        except RuntimeError: self.flush() # ? No running loop, play right away
+
+    def gain(self, distance: float) -> float:
+        """Returns the attenuation of an emitter at `distance` from the listener."""
+        p = self.params
+        if distance >= p.max_distance: return 0.0
+        if distance <= p.ref_distance: return 1.0
+        return p.ref_distance / (p.ref_distance + p.rolloff * (distance - p.ref_distance))
+
+    def flush(self):
+        """Computes the pan and attenuation of the queued SFX, and plays the audible ones (merged)."""
+        self._flush_handle = None
+        pending, self._pending = self._pending, []
+        if not pending: return
+        listener = self.listener_x()
+        pan_width = self.params.pan_width or max((self.page.width or 0) / 2, 1)
+        gain = self.gain
+        merged: dict[Path, MergedRequest] = {}
+        exempt: set[Path] = set()
+        for emission in pending:
+            dx = emission.x - listener
+            loudness = emission.volume * gain(abs(dx))
+            if loudness < self.min_gain: continue
+            # ? Equal-power panning, -1 (left) to 1 (right)
+            angle = (max(-1.0, min(dx / pan_width, 1.0)) + 1) * math.pi / 4
+            request = merged.get(emission.sfx)
+            if request is None: request = merged[emission.sfx] = MergedRequest()
+            request.add(loudness, math.cos(angle), math.sin(angle))
+            if emission.emitter is not None and emission.emitter is self._listener_emitter:
+                exempt.add(emission.sfx)
+        audible = sum(request.count for request in merged.values())
+        self.culled += len(pending) - audible
+        self.merged += audible - len(merged)
+
+        # ? Rate caps, then the voice cap, on the merged SFX
+        arbiter = self.audio_manager.arbiter
+        now = time.perf_counter()
+        voices: list[tuple[float, Path, float, float]] = []
+        for sfx, request in merged.items():
+            if arbiter is not None and sfx not in exempt and arbiter.is_limited(sfx, now):
+                self.limited += 1
+                continue
+            voices.append((request.volume, sfx, *request.pan))
+        if len(voices) > self.max_voices:
+            voices.sort(key=lambda voice: voice[0], reverse=True)
+            self.culled += len(voices) - self.max_voices
+            del voices[self.max_voices:]
+        self.played += len(voices)
+        for volume, sfx, left, right in voices:
+            if arbiter is not None: arbiter.record_play(sfx, now)
+            self.audio_manager.play_sfx_now(sfx, left, right, volume)
+
+    def clear(self):
+        if self._flush_handle is not None: self._flush_handle.cancel()
+        self._flush_handle = None
+        self._pending.clear()
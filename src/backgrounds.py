@@ -1,10 +1,20 @@
 import flet as ft
+import json
+from functools import cache
+from pathlib import Path
+
+from images import has_prescaled_variants
+from utilities.asset_pack import image_exists, read_image_bytes, resolve_image_src
+from utilities.file_management import get_variant_src, resolver
 
 # --- CONSTANTS ---
 IMG_WIDTH = 928
 IMG_HEIGHT = 793
 SCALE = 2
 DEFAULT_DURATION = 1000
+FOREST_DIR = "images/backgrounds/night_forest"
+FLATTENED_DIR = f"{FOREST_DIR}/flattened"
+FLATTENED_MANIFEST = f"{FLATTENED_DIR}/manifest.json"
 
 # Map index to specific durations (None = No animation)
 LAYER_DURATIONS = {
@@ -20,29 +30,110 @@ LAYER_DURATIONS = {
 # Layers that need to be wider (3 and 6)
 WIDE_LAYERS = {3, 6}
 
-def bg_image_forest(index: int, page: ft.Page) -> ft.Image:
-    """Returns an image configured for the background."""
+# Layers that move on their own (light), these are never panned nor flattened
+DYNAMIC_LAYERS = {3, 6}
+
+# Parallax factor of each layer when panning the stage (default = 1)
+LAYER_PAN_FACTORS = {
+    1: 0.2,
+    2: 0.4,
+    4: 0.6,
+    5: 0.8
+}
+
+# Draw order of the layers, from back to front
+BACKGROUND_LAYERS = (1, 2, 3, 4, 5, 6, 9)
+FOREGROUND_LAYERS = (8, 10)
+
+# Cache for the flattened layer lookups, so the disk is only checked once
+_flattened_srcs: dict[tuple[int, ...], str | None] = {}
+
+def get_layer_src(index: int) -> str:
+    """Returns the asset `src` of a single forest layer."""
+    return f"{FOREST_DIR}/{index}.png"
+
+def group_layers(layers: tuple[int, ...]) -> list[tuple[int, ...]]:
+    """
+    Groups neighbouring layers that share the same parallax factor.\n
+    Dynamic layers are always kept in a group of their own.
+    """
+    groups: list[list[int]] = []
+    for index in layers:
+        if groups and index not in DYNAMIC_LAYERS and groups[-1][-1] not in DYNAMIC_LAYERS \
+        and LAYER_PAN_FACTORS.get(index, 1) == LAYER_PAN_FACTORS.get(groups[-1][-1], 1):
+            groups[-1].append(index)
+        else: groups.append([index])
+    return [tuple(group) for group in groups]
+
+def layer_group_key(group: tuple[int, ...]) -> str:
+    """Returns the key of a layer group in the flattened images' manifest (i.e.: `"1,2"`)."""
+    return ",".join(map(str, group))
+
+@cache
+def _flattened_manifest() -> dict[str, str]:
+    """Returns the manifest of the flattened images (group key -> file name), see `tools/flatten_layers.py`."""
+    try: return json.loads(read_image_bytes(FLATTENED_MANIFEST))
+    except (OSError, KeyError, ValueError): return {}
+
+def get_flattened_src(group: tuple[int, ...]) -> str | None:
+    """
+    Returns the `src` of the pre-flattened image of a layer group.
+    Returns `None` if the group has a single layer or if it has not been flattened yet.
+    """
+    if len(group) < 2: return None
+    if group not in _flattened_srcs:
+        name = _flattened_manifest().get(layer_group_key(group))
+        src = f"{FLATTENED_DIR}/{name}" if name else None
+        # ? An overlay replacing one of the layers isn't part of the flattened image
+        if any(resolver.override(f"assets/{get_layer_src(index)}") for index in group): src = None
+        if src is not None and not image_exists(src): src = None
+        _flattened_srcs[group] = src
+    return _flattened_srcs[group]
+
+def bg_image_forest(index: int, page: ft.Page, *, src: str = None, prescaled: bool = None) -> ft.Image:
+    """
+    Returns an image configured for the background.\n
+    If `prescaled` is `True` (or `None` and the variants exist), the pre-scaled variant is
+    displayed natively in a box that covers the same area as the scaled image.
+    """
+    if src is None: src = get_layer_src(index)
+    if prescaled is None: prescaled = has_prescaled_variants(Path(src).parent.as_posix(), SCALE)
+    
     # Get duration from dict, default to 1000 if not found
     duration = LAYER_DURATIONS.get(index, DEFAULT_DURATION)
-    
+
     # Create Animation Object
     if duration is None: anim = None
     else: anim = ft.Animation(duration, ft.AnimationCurve.EASE_IN_OUT)
-    
+
     # If index is 3 or 6, use 4x width, otherwise 2x
     width_mult = 4 if index in WIDE_LAYERS else 2
+    width = IMG_WIDTH * width_mult
+    height = IMG_HEIGHT * 2
+    left = page.width / 2
+    bottom = 0
+    offset_y = 0.05
+    
+    if prescaled:
+        # ? Grow the box around its center instead of scaling it, the offset is relative to the box
+        src = get_variant_src(src, SCALE)
+        left -= width * (SCALE - 1) / 2
+        bottom -= height * (SCALE - 1) / 2
+        width *= SCALE
+        height *= SCALE
+        offset_y /= SCALE
 
     return ft.Image(
-        src=f"images/backgrounds/night_forest/{index}.png",
+        src=resolve_image_src(src),
         data=index,
         # Dimensions
-        width=IMG_WIDTH * width_mult,
-        height=IMG_HEIGHT * 2,
-        scale=SCALE,
+        width=width,
+        height=height,
+        scale=None if prescaled else SCALE,
         # Placement
-        left=page.width / 2,
-        bottom=0,
-        offset=ft.Offset(0, 0.05),
+        left=left,
+        bottom=bottom,
+        offset=ft.Offset(0, offset_y),
         # Rendering Quality
         filter_quality=ft.FilterQuality.NONE,
         gapless_playback=True,
@@ -50,4 +141,18 @@ def bg_image_forest(index: int, page: ft.Page) -> ft.Image:
         repeat=ft.ImageRepeat.REPEAT if index == 0 else ft.ImageRepeat.REPEAT_X,
         # Animation
         animate_position=anim,
-    )
\ No newline at end of file
+    )
+
+def bg_layers_forest(layers: tuple[int, ...], page: ft.Page) -> list[ft.Image]:
+    """
+    Returns the images for the given `layers`, using the pre-flattened
+    images (see `tools/flatten_layers.py`) where available.\n
+    A flattened image takes the `data` of the first layer in its group.
+    """
+    images: list[ft.Image] = []
+    for group in group_layers(layers):
+        flattened_src = get_flattened_src(group)
+        if flattened_src is not None:
+            images.append(bg_image_forest(group[0], page, src=flattened_src))
+        else: images.extend(bg_image_forest(index, page) for index in group)
+    return images
@@ -4,6 +4,9 @@ import flet as ft
 from entities.player import Player
 from entities.entity import Entity
 from entities.enemy import Enemy
+from backgrounds import DYNAMIC_LAYERS, LAYER_PAN_FACTORS
+from utilities.event_bus import EventBus, Panned
+from utilities.tasks import name_current_task
 from typing import Callable
 
 
@@ -13,13 +16,14 @@ async def light_mv_loop(background_stack: ft.Stack):
     Pass this directly in the `page.run_task()` method.\n
     Example: `page.run_task(light_mv_loop)`
     """
+    name_current_task("light_mv_loop")
     duration: float = 0.0
     step = 928
     await asyncio.sleep(1)
     while True:
         for bg in background_stack.controls:
             bg: ft.Image
-            if bg.data == 3 or bg.data == 6:
+            if bg.data in DYNAMIC_LAYERS:
                 duration = bg.animate_position.duration
                 bg.left += step
                 bg.update()
@@ -33,33 +37,29 @@ async def stage_panning_loop(
     player: Player,
     entity_list: list[Entity],
     stage: ft.Stack,
-    post_callback: Callable[[None], None] = None
+    post_callback: Callable[[None], None] = None,
+    event_bus: EventBus = None
 ):
     """
     Handles the stage panning to either left or right.
     Pass this directly in the `page.run_task()` method.\n
     Example: `page.run_task(stage_panning_loop)`\n
-    `post_callback()` is called after panning the stage.
+    `post_callback()` is called after panning the stage, and `Panned` is published to `event_bus`
+    (both before the stage is updated).
     """
+    name_current_task("stage_panning_loop")
     # Constants for configuration
     PAN_STEP = 928 / 2
     EDGE_THRESHOLD = 20
     PAN_ANIM_DURATION = 1000 # ms
-    IGNORED_LAYERS = {3, 6}
-    LAYER_STEPS = {
-        1: 0.2,
-        2: 0.4,
-        4: 0.6,
-        5: 0.8
-    }
     
     async def perform_pan(step_amount: float):
         """Helper to move world elements and handle entity states."""
         # Move Backgrounds
         for bg in background_stack.controls:
             bg: ft.Image
-            if bg.data in IGNORED_LAYERS: continue
-            bg.left += step_amount * LAYER_STEPS.get(bg.data, 1)
+            if bg.data in DYNAMIC_LAYERS: continue
+            bg.left += step_amount * LAYER_PAN_FACTORS.get(bg.data, 1)
                 
         # Move Foregrounds
         for fg in foreground_stack.controls: fg.left += step_amount
@@ -78,13 +78,16 @@ async def stage_panning_loop(
             entity.states.disable_movement = False
             entity.stack.animate_position.duration = 100
         if post_callback: post_callback()
+        if event_bus:
+            event_bus.publish(Panned(step_amount))
+            event_bus.dispatch() # ? Subscribers run ahead of the stage update below
         stage.update()
         
     while True:
         await asyncio.sleep(1)
         # Calculate positions
         player_x = player.stack.left
-        player_right_edge = player_x + player.sprite.width
+        player_right_edge = player_x + player.sprite.base_width
         screen_right_edge = page.width - EDGE_THRESHOLD
         step_to_take = 0
         is_panning: bool = False
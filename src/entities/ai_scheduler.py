@@ -0,0 +1,167 @@
+import asyncio, heapq, itertools, time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from entities.steering import Agent, CrowdSteering, Steer
+from load_governor import LoadGovernor, default_governor
+
+if TYPE_CHECKING:
+    from entities.entity import Entity
+    from entities.enemy import Enemy
+
+BASE_THINK_INTERVAL = 0.05 # s, the interval that the enemies' steps are tuned for
+
+
+@dataclass(frozen=True, slots=True)
+class TargetSnapshot:
+    """A target's position and state, taken once per tick and shared by every enemy thinking on it."""
+    entity: "Entity"
+    left: float
+    bottom: float
+    width: float
+    height: float
+    dead: bool
+
+    @classmethod
+    def of(cls, entity: "Entity") -> "TargetSnapshot":
+        return cls(
+            entity, entity.stack.left or 0, entity.stack.bottom or 0,
+            entity.sprite.base_width, entity.sprite.base_height, entity.states.dead
+        )
+
+    @property
+    def center_x(self) -> float: return self.left + self.width / 2
+
+@dataclass(slots=True)
+class AIStats:
+    thinks: int = 0
+    deferred: int = 0   # Due thinks pushed to the next frame, over the budget
+    frames: int = 0
+
+class AIScheduler:
+    """
+    Runs the think ticks of every enemy from a single per-frame callback, instead of a loop each.\n
+    Enemies are ticked in the order they're due (round-robin, as they all share the same interval),
+    and at most `max_thinks` of them (or `time_budget` seconds' worth) per frame, the rest waits for
+    the next frame. The AI cost of a frame then stays flat, and enemies spawned together spread out
+    over the frames. Targets are snapshot once per frame, and shared by the enemies (see `Enemy.ai_tick`).
+    The steps of the enemies chasing a target are also planned once per frame, by the `CrowdSteering`.
+    The think interval is scaled by the current quality tier's `ai_tick_scale`.
+    """
+    def __init__(
+        self, *, frame_time: float = 1 / 60, think_interval: float = BASE_THINK_INTERVAL,
+        max_thinks: int = 6, time_budget: float = 0.004, governor: LoadGovernor = None,
+        steering: CrowdSteering = None
+    ):
+        self.frame_time = frame_time
+        self.think_interval = think_interval
+        self.max_thinks = max_thinks
+        self.time_budget = time_budget
+        self.governor: LoadGovernor = governor if governor is not None else default_governor
+        self.steering: CrowdSteering = steering if steering is not None else CrowdSteering()
+        self.stats = AIStats()
+        # ? (due, order, enemy), the order keeps enemies due at the same time first come first served
+        self._queue: list[tuple[float, int, "Enemy"]] = []
+        self._order = itertools.count()
+        self._last_tick: dict["Enemy", float] = {}
+        # ? Enemy -> order of its queued tick, older entries (i.e.: registered again) are dropped
+        self._entries: dict["Enemy", int] = {}
+        self._snapshots: dict["Entity", TargetSnapshot] = {}
+        self._plans: dict["Entity", dict["Enemy", Steer]] = {}
+        self._tick_handle: asyncio.TimerHandle = None
+
+    @property
+    def interval(self) -> float:
+        return self.think_interval * self.governor.tier.ai_tick_scale
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def register(self, enemy: "Enemy", delay: float = 0):
+        """Schedules the think ticks of `enemy`, the first one after `delay` seconds."""
+        now = time.perf_counter()
+        self._last_tick[enemy] = now
+        self._push(enemy, now + delay)
+        self._schedule()
+
+    def unregister(self, enemy: "Enemy"):
+        """Stops ticking `enemy`, its queued tick is dropped when it comes up."""
+        self._last_tick.pop(enemy, None)
+        self._entries.pop(enemy, None)
+
+    def snapshot(self, target: "Entity | None") -> TargetSnapshot | None:
+        """Returns the snapshot of `target` for the current frame."""
+        if target is None: return None
+        snapshot = self._snapshots.get(target)
+        if snapshot is None: snapshot = self._snapshots[target] = TargetSnapshot.of(target)
+        return snapshot
+
+    def steer(self, enemy: "Enemy", target: TargetSnapshot) -> Steer | None:
+        """Returns the step of `enemy` towards its slot around `target`, planned for the current frame."""
+        plan = self._plans.get(target.entity)
+        if plan is None:
+            agents = [
+                Agent(e, e.stack.left + e.sprite.base_width / 2, e.stats.movement_speed, e.melee_range)
+                for e in self._entries if e.target is target.entity and not e.states.dead
+            ]
+            plan = self._plans[target.entity] = self.steering.plan(agents, target.center_x)
+        return plan.get(enemy)
+
+    def clear(self):
+        if self._tick_handle is not None: self._tick_handle.cancel()
+        self._tick_handle = None
+        self._queue.clear()
+        self._last_tick.clear()
+        self._entries.clear()
+        self._snapshots.clear()
+        self._plans.clear()
+
+    # * === INTERNALS ===
+    def _push(self, enemy: "Enemy", due: float):
+        order = self._entries[enemy] = next(self._order)
+        heapq.heappush(self._queue, (due, order, enemy))
+
+    def _schedule(self):
+        if self._tick_handle is not None: return
+        try: self._tick_handle = asyncio.get_running_loop().call_later(self.frame_time, self._tick)
+        except RuntimeError: pass # ? No running loop, nothing to tick on
+
+    def _tick(self):
+        self._tick_handle = None
+        try: self._run_thinks()
+        finally:
+            if self._entries: self._schedule() # ? Re-armed even if a tick failed
+
+    def _run_thinks(self):
+        self._snapshots.clear()
+        self._plans.clear()
+        self.stats.frames += 1
+        start = now = time.perf_counter()
+        interval = self.interval
+        thinks = 0
+        while self._queue and self._queue[0][0] <= now:
+            if thinks >= self.max_thinks or now - start >= self.time_budget:
+                self.stats.deferred += sum(1 for due, _, _ in self._queue if due <= now)
+                break
+            _, order, enemy = heapq.heappop(self._queue)
+            if self._entries.get(enemy) != order: continue # ? Unregistered, or registered again
+            if enemy.states.dead:
+                self.unregister(enemy)
+                continue
+            # ? Capped, so a late tick (i.e.: after an attack) doesn't make a leap
+            elapsed = min(now - self._last_tick[enemy], interval * 2)
+            try: delay = enemy.ai_tick(self.snapshot(enemy.target), elapsed / BASE_THINK_INTERVAL)
+            except Exception as e:
+                # ? A broken enemy stops thinking, instead of stopping every enemy
+                print(f"[AIScheduler] Error ticking {type(enemy).__name__}, unregistering it: {e!r}")
+                self.unregister(enemy)
+                delay = None
+            if enemy in self._entries: # ? Not unregistered while ticking
+                self._last_tick[enemy] = now
+                self._push(enemy, now + (interval if delay is None else delay))
+            thinks += 1
+            now = time.perf_counter()
+        self.stats.thinks += thinks
+
+# ? Shared by every enemy
+default_scheduler = AIScheduler()
@@ -0,0 +1,97 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from entities.entity import Entity
+
+
+@dataclass(slots=True)
+class TargetTokens:
+    """The attack tokens of a target: holder -> time granted, and the waiting attackers (FIFO) -> last request."""
+    holders: dict["Entity", float] = field(default_factory=dict)
+    waiting: OrderedDict["Entity", float] = field(default_factory=OrderedDict)
+
+@dataclass(slots=True)
+class TokenStats:
+    granted: int = 0
+    denied: int = 0
+    expired: int = 0    # Leases reclaimed from holders that never released them
+
+class AttackTokenManager:
+    """
+    Bounds how many attackers can swing at a same target at once, to `max_attackers`.\n
+    An attacker has to hold a token of its target to attack it, and releases it once its attack is
+    over. Attackers denied a token wait in line, and free tokens go to the first in line, so they're
+    shared in turns. Waiters that stop asking for `wait_timeout` seconds (i.e.: they walked away) leave
+    the line, and tokens held over `lease` seconds are reclaimed (i.e.: a missed release).
+    """
+    def __init__(self, *, max_attackers: int = 2, lease: float = 2.0, wait_timeout: float = 0.5):
+        self.max_attackers = max_attackers
+        self.lease = lease
+        self.wait_timeout = wait_timeout
+        self.stats = TokenStats()
+        self._targets: dict["Entity", TargetTokens] = {}
+        # ? Attacker -> target of its token
+        self._held: dict["Entity", "Entity"] = {}
+
+    def holds(self, attacker: "Entity") -> bool:
+        return attacker in self._held
+
+    def attackers(self, target: "Entity") -> int:
+        tokens = self._targets.get(target)
+        return len(tokens.holders) if tokens is not None else 0
+
+    def request(self, attacker: "Entity", target: "Entity") -> bool:
+        """Returns `True` if `attacker` holds (or was just granted) a token of `target`, otherwise it waits in line."""
+        tokens = self._targets.get(target)
+        if tokens is None: tokens = self._targets[target] = TargetTokens()
+        now = time.perf_counter()
+        if attacker in tokens.holders: return True
+        if attacker in self._held: self.release(attacker) # ? Switched target
+        self._prune(tokens, now)
+
+        free = self.max_attackers - len(tokens.holders)
+        # ? Only the first `free` attackers in line can take a token
+        ahead = 0
+        for waiter in tokens.waiting:
+            if waiter is attacker or ahead >= free: break
+            ahead += 1
+        if free > 0 and ahead < free:
+            tokens.waiting.pop(attacker, None)
+            tokens.holders[attacker] = now
+            self._held[attacker] = target
+            self.stats.granted += 1
+            return True
+        tokens.waiting[attacker] = now # ? Keeps its place in line, if it was already waiting
+        self.stats.denied += 1
+        return False
+
+    def release(self, attacker: "Entity"):
+        """Releases the token held by `attacker` (if any), and takes it out of every line."""
+        target = self._held.pop(attacker, None)
+        if target is not None: self._targets[target].holders.pop(attacker, None)
+        for tokens in self._targets.values(): tokens.waiting.pop(attacker, None)
+
+    def clear_target(self, target: "Entity"):
+        """Drops every token of `target` (i.e.: it died or despawned)."""
+        tokens = self._targets.pop(target, None)
+        if tokens is None: return
+        for attacker in tokens.holders: self._held.pop(attacker, None)
+
+    def clear(self):
+        self._targets.clear()
+        self._held.clear()
+
+    def _prune(self, tokens: TargetTokens, now: float):
+        for holder, granted in list(tokens.holders.items()):
+            if now - granted <= self.lease: continue
+            del tokens.holders[holder]
+            self._held.pop(holder, None)
+            self.stats.expired += 1
+        for waiter, asked in list(tokens.waiting.items()):
+            if now - asked > self.wait_timeout: del tokens.waiting[waiter]
+
+# ? Shared by every enemy
+default_tokens = AttackTokenManager()
@@ -1,16 +1,31 @@
 import asyncio, random
 import flet as ft
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 
-from entities.entity import Entity, EntityStates, EntityStats, Factions
+from entities.entity import Entity, EntityStats, Factions
+from entities.state_machine import Action, ActionState, ATTACK_STATES, ENEMY_TABLE
 from images import Sprite
 from audio.audio_manager import AudioManager
+from audio.spatial import SpatialAudio
 from audio.sfx_data import SFXLibrary
-from utilities.tasks import attempt_cancel
+from utilities.tasks import attempt_cancel, name_current_task
+from utilities.lag_monitor import monitor as lag_monitor
 from utilities.collisions import is_in_range
+from entities.ai_scheduler import AIScheduler, TargetSnapshot, default_scheduler
+from entities.attack_tokens import AttackTokenManager, default_tokens
+from hud import HUDManager
+from utilities.event_bus import EventBus
 
 sfx = SFXLibrary()
+DISTANT_RANGE = 600 # px from the target, past which the animations can be thinned out
+
+@dataclass(frozen=True, slots=True)
+class WaveData:
+    """How an enemy type is summoned in waves, see `SpawnDirector`."""
+    min_size: int = 1
+    max_size: int = 5
+    max_alive: int = 8 # Alive enemies of this type, queued spawns included
 
 @dataclass
 class EnemyData:
@@ -18,23 +33,31 @@ class EnemyData:
     width: ft.Number = 150
     height: ft.Number = 150
     melee_range: int = 100
+    names: tuple[str, ...] = () # Random names to pick from when summoned
+    wave: WaveData = field(default_factory=WaveData)
 
 class EnemyType(Enum):
     """Available enemy types."""
     # TODO: Finish processing the other enemy assets
     # FLYING_EYE = EnemyData("Flying Eye")
-    GOBLIN = EnemyData("Gobby")
+    GOBLIN = EnemyData("Gobby", names=(
+        "Gobby", "Gibby", "Geeb", "Goob", "Gubby", "Gebby", "Gub", "Gerald", "Gibby", "Gib",
+        "Gob", "Gobber", "Gob Lin", "Gob Gob", "Geb Geb", "Gub Gub", "Gib Gib", "Gibba", "Gibber"
+    ), wave=WaveData(min_size=1, max_size=5, max_alive=8))
     # MUSHROOM = EnemyData("Mushy")
     # SKELETON = EnemyData("Skelly")
 
 # TODO: Finish the Enemy class
 class Enemy(Entity):
     """Handles an enemy's actions and states."""
+    _transition_table = ENEMY_TABLE
+    
     def __init__(
         self, type: EnemyType, page: ft.Page,
         audio_manager: AudioManager, target: Entity = None,
         name: str = None, entity_list: list[Entity] = None,
-        *, debug: bool = False
+        *, debug: bool = False, event_bus: EventBus = None, hud_manager: HUDManager = None,
+        spatial_audio: SpatialAudio = None
     ):
         """
         Important setup for the class. Starts setup with the
@@ -50,8 +73,9 @@ class Enemy(Entity):
         super().__init__(
             sprite=_sprite, name=self.name, page=page,
             audio_manager=audio_manager, faction=Factions.NONHUMAN,
-            entity_list=entity_list,
-            debug=debug, stats=EntityStats(movement_speed=12)
+            entity_list=entity_list, debug=debug,
+            stats=EntityStats(movement_speed=12), event_bus=event_bus, hud_manager=hud_manager,
+            spatial_audio=spatial_audio
         )
         
         # ? Internal class setup
@@ -66,6 +90,9 @@ class Enemy(Entity):
         self._cached_player_stack = None
         self._damage_detection_task: asyncio.Task = None
         self._rnd_dx: int = 0
+        self.ai_scheduler: AIScheduler = default_scheduler
+        self.attack_tokens: AttackTokenManager = default_tokens
+        self._target_distance: float = 0 # ? From the last think tick
         self._make_atk_hitbox(
             p1_r_left=-15, p1_width=180, p1_height=100,
             p2_r_left=70, p2_width=140, p2_height=80
@@ -75,28 +102,32 @@ class Enemy(Entity):
     # * === LOOPING ANIMATIONS ===
     async def _animation_loop(self):
         """Handles an enemy's different animation loops."""
+        name_current_task(f"{self._handler_str}.animation_loop")
         index: int = 0
         while not self.states.dead:
             # Give way to other animations
-            if self.states.is_attacking or self.states.taking_damage or self.states.dead:
+            if self.fsm.state is not ActionState.IDLE:
                 await asyncio.sleep(0.1) # ? Important logic delay
                 continue
             
+            # ? Distant enemies skip frames under load, at the same animation speed
+            stride = self.governor.tier.distant_anim_stride if self._is_distant() else 1
+            
             # Running animation
             if self.states.is_moving:
-                if index > 7: index = 0
-                await asyncio.sleep(0.075)
+                if index > 7: index %= 8
+                await asyncio.sleep(0.075 * stride)
                 self.sprite.change_src(self._get_spr_path("run", index))
-                if index == 2: self._play_sfx(sfx.footsteps.footstep_grass_1, 0.2)
-                if index == 5: self._play_sfx(sfx.footsteps.footstep_grass_1, 0.2)
+                if {2, 5}.intersection(range(index, index + stride)): # ? Includes the skipped frames
+                    self._play_footstep(sfx.footsteps.footstep_grass_1, volume=0.2)
              
              # Idle animation
             else:
-                if index > 3: index = 0
-                await asyncio.sleep(0.1)
+                if index > 3: index %= 4
+                await asyncio.sleep(0.1 * stride)
                 self.sprite.change_src(self._get_spr_path("idle", index))
             
-            index += 1
+            index += stride
     
     def _start_animation_loop(self):
         """Starts the animation loop and stores it in a variable."""
@@ -105,6 +136,7 @@ class Enemy(Entity):
     # * === CUSTOM MOVEMENT LOOP ===
     async def _movement_loop(self):
         """Handles the enemy's movements."""
+        name_current_task(f"{self._handler_str}.movement_loop")
         await asyncio.sleep(0.1)
         self.stack.opacity = 1
         self._safe_update(self.stack)
@@ -115,44 +147,63 @@ class Enemy(Entity):
         self._debug_msg(f"Idling for {wait_time}")
         await asyncio.sleep(wait_time - 2.0)
         self.is_idling = False
+        # ? From here, the enemy thinks and moves on the ticks of the AI scheduler
+        if not self.states.dead: self.ai_scheduler.register(self)
+    
+    def ai_tick(self, target: TargetSnapshot | None, step_scale: float = 1.0) -> float | None:
+        """
+        Thinks and steps once, called by the `AIScheduler`. `step_scale` is the time since the
+        previous tick (in base think intervals), the steps are scaled by it to keep the same speed.
+        Returns the delay before the next tick, `None` for the scheduler's interval.
+        """
+        if self.states.disable_movement or not self.fsm.can(Action.MOVE):
+            self.states.is_moving = False
+            return 0.1
         
-        while not self.states.dead:
-            if self.states.disable_movement or self.states.disable_movement:
-                self.states.is_moving = False
-                await asyncio.sleep(0.1)
-                continue
-            
-            dx, dy = 0, 0
+        with lag_monitor.section("ai"): dx = self._think(target)
+        if dx is None: return 1.0 # ? Attacked
+        
+        self._check_movement(round(dx * step_scale), 0)
+        if self.states.is_moving:
+            self.states.dealing_damage = False
+            self._safe_update(self.stack)
+        return None
+    
+    def _think(self, target: TargetSnapshot | None) -> int | None:
+        """Decides the enemy's next step. Returns the x-axis step, or `None` if it attacked."""
+        dx = 0
+        if target is not None: self._target_distance = abs(target.left - self.stack.left)
+        if not self._is_target_in_range(target):
+            if target and not target.dead: # ? Chase Player (if out of range)
+                self._debug_msg(f"Chasing {target.entity.name}", end=" -> ")
+                # ? Spread around the target with the rest of the crowd (see `CrowdSteering`)
+                steer = self.ai_scheduler.steer(self, target)
+                if steer is not None: dx = round(steer.dx)
+                elif target.left > self.stack.left: dx = self.stats.movement_speed
+                elif target.left < self.stack.left: dx = -self.stats.movement_speed
+                self.is_idling = False
+            else: self.is_idling = True
             
-            if not self._is_player_in_range():
-                if self.target and not self.target.states.dead: # ? Chase Player (if out of range)
-                    self._debug_msg(f"Chasing {self.target.name}", end=" -> ")
-                    if self.target.stack.left > self.stack.left: dx = self.stats.movement_speed
-                    elif self.target.stack.left < self.stack.left: dx = -self.stats.movement_speed
+        else: # ? Attack Player (if in range)
+            if target and not target.dead:
+                # ? Only a few enemies can attack a target at once, the others hold their ground
+                if not self.attack_tokens.request(self, target.entity):
                     self.is_idling = False
-                else: self.is_idling = True
-                
-            else: # ? Attack Player (if in range)
-                if self.target and not self.target.states.dead:
-                    self._debug_msg("Attacking player")
-                    self.attack()
-                    await asyncio.sleep(1)
-                    continue
-                else: self.is_idling = True
-            
-            if self.is_idling:
-                if self._rnd_dx == 0:
-                    if random.randint(1, 10) > 9:
-                        self._rnd_dx = random.randint(-1, 1) * self.stats.movement_speed
-                else:
-                    if random.randint(1, 10) > 7: self._rnd_dx = 0
-                    else: dx += self._rnd_dx
-            
-            self._check_movement(dx, dy)
-            if self.states.is_moving:
-                self.states.dealing_damage = False
-                self._safe_update(self.stack)
-            await asyncio.sleep(0.05)
+                    return 0
+                self._debug_msg("Attacking player")
+                self.attack()
+                if self.fsm.state not in ATTACK_STATES: self.attack_tokens.release(self)
+                return None
+            else: self.is_idling = True
+        
+        if self.is_idling:
+            if self._rnd_dx == 0:
+                if random.randint(1, 10) > 9:
+                    self._rnd_dx = random.randint(-1, 1) * self.stats.movement_speed
+            else:
+                if random.randint(1, 10) > 7: self._rnd_dx = 0
+                else: dx += self._rnd_dx
+        return dx
         
     
     # * === ONE-SHOT ANIMATIONS ===
@@ -176,10 +227,8 @@ class Enemy(Entity):
                 self.states.dealing_damage = False
                 self._toggle_atk_hb_border()
             self.sprite.change_src(self._get_spr_path(prefix, i))
-        self._modify_self_hitbox(reset=True)
-        self.states.is_attacking = False
         self._attack_task = None
-        self._toggle_atk_hb_border()
+        self.fsm.fire(Action.RECOVER)
     
     async def _death_anim(self):
         """Handles the enemy's death animation."""
@@ -189,25 +238,50 @@ class Enemy(Entity):
         for i in range(4):
             await asyncio.sleep(0.1)
             self.sprite.change_src(self._get_spr_path("death", i))
-        self.states.revivable = True
+        self.fsm.fire(Action.SETTLE)
     
     async def _take_hit_anim(self):
         """Handles the enemy's taking damage animation."""
+        hit = self._last_hit
+        attacker = hit.attacker if hit is not None else self.target
+        attack_phase = hit.attack_phase if hit is not None else attacker.states.attack_phase
         for i in range(4):
             await asyncio.sleep(0.1)
             self.sprite.change_src(self._get_spr_path("take-hit", i))
             if i == 1 and self.type == EnemyType.GOBLIN:
                 self._play_sfx(sfx.enemy.goblin_hurt)
-                if self.target.states.attack_phase == 1: self._play_sfx(sfx.impacts.flesh_impact_1)
-                if self.target.states.attack_phase == 2: self._play_sfx(sfx.impacts.axe_hit_flesh)
-            if i == 2: self._knockback_self(self.target)
-        self.states.taking_damage = False
+                if attack_phase == 1: self._play_sfx(sfx.impacts.flesh_impact_1)
+                if attack_phase == 2: self._play_sfx(sfx.impacts.axe_hit_flesh)
+            if i == 2 and attacker is not None: self._knockback_self(attacker)
         self._take_hit_task = None
+        self.fsm.fire(Action.RECOVER)
+    
+    # * === STATE MACHINE HOOKS ===
+    def _on_state_exit(self, prev: ActionState, new: ActionState):
+        """Cancels the animation of the action that is being left or interrupted."""
+        super()._on_state_exit(prev, new)
+        if prev in ATTACK_STATES:
+            attempt_cancel(self._attack_task)
+            if new not in ATTACK_STATES: self.attack_tokens.release(self)
+        if prev is ActionState.TAKING_DAMAGE: attempt_cancel(self._take_hit_task)
+    
+    def _on_state_enter(self, prev: ActionState, new: ActionState):
+        """Starts the animation of the action that has been entered."""
+        super()._on_state_enter(prev, new)
+        if new is ActionState.ATTACKING:
+            self._attack_task = self.page.run_task(self._attack_anim)
+        elif new is ActionState.TAKING_DAMAGE:
+            self._take_hit_task = self.page.run_task(self._take_hit_anim)
+        elif new is ActionState.DYING:
+            attempt_cancel(self._animation_loop_task)
+            self._cancel_temp_tasks()
+            self.attack_tokens.release(self) # ? Takes it out of the lines too
     
     # * === CLEANUP ===
     def remove_selves(self):
-        """Removes `self` from `stage` and `_entity_list`."""
+        """Removes `self` from `stage`, `_entity_list` and its HUD manager."""
         stage = self._get_parent()
+        self.hud_manager.unregister(self)
         
         self._debug_msg(f"Attempting to remove self from stage: {len(stage.controls)} -> ", end="")
         if self in stage.controls: stage.controls.remove(self.stack)
@@ -225,7 +299,7 @@ class Enemy(Entity):
         random across the x-axis.
         """
         if not center_spawn:
-            new_left = random.randint(0, int(self.page.width)) - self.sprite.width
+            new_left = random.randint(0, int(self.page.width)) - self.sprite.base_width
             self.stack.left = new_left
         if start_loops:
             self._start_animation_loop()
@@ -235,22 +309,16 @@ class Enemy(Entity):
     async def death(self):
         """Cancels all running tasks, and plays the death animation."""
         if not super().death(): return
-        # ? Death states and stats
-        self._reset_states(EntityStates(dead=True))
-        self._reset_stats(EntityStats(health=0))
+        # ? Death states and stats (the animations are cancelled by the state hooks)
+        self.fsm.fire(Action.DIE)
+        self._reset_stats(health=0)
         self._debug_msg(f"{self.name} has died!")
-        await self._update_health_bar()
-        
-        # ? Animation handling
-        attempt_cancel(self._animation_loop_task)
-        self._cancel_temp_tasks()
+        self._refresh_health_bar()
         await self._death_anim()
-        self._toggle_atk_hb_border()
-        self.states.revivable = True
         await asyncio.sleep(1) # A bit of delay before despawning
         
         # ? Despawn and cleanup
-        self.states.revivable = False
+        self.fsm.fire(Action.DESPAWN)
         self.stack.opacity = 0
         self._safe_update(self.stack)
         await asyncio.sleep(self.stack.animate_opacity.duration / 1000)
@@ -266,27 +334,21 @@ class Enemy(Entity):
         self.states.attack_phase += 1
         if self.states.attack_phase > 2: self.states.attack_phase = 1
         self._debug_msg(f"Attacking! Phase: {self.states.attack_phase}")
-        self.states.is_attacking = True
         self.states.dealing_damage = False
-        self._attack_task = self.page.run_task(self._attack_anim)
+        self.fsm.fire(Action.ATTACK)
     
     async def take_damage(self, damage_amount: float):
         """Decrease enemy's health with logic."""
-        if not super().take_damage(): return
-        self.stats.health -= damage_amount
-        self._debug_msg(f"HP: {self.stats.health}/{self.stats.max_health}(-{damage_amount})")
-        self.states.taking_damage = True
-        self.states.is_moving = False
-        if self.states.is_attacking:
-            attempt_cancel(self._attack_task)
-            self.states.is_attacking = False
-            self.states.dealing_damage = False
-            self._toggle_atk_hb_border()
-            self._modify_self_hitbox(reset=True)
-            self._safe_update(self.stack)
+        self._last_hit = None
+        if not self._apply_damage(damage_amount): return
         if self.stats.health <= 0: await self.death()
-        else: self._take_hit_task = self.page.run_task(self._take_hit_anim)
-        await self._update_health_bar()
+        self._refresh_health_bar()
+    
+    def _apply_damage(self, damage_amount: float) -> bool:
+        """Stops the enemy in its tracks when damaged."""
+        if not super()._apply_damage(damage_amount): return False
+        self.states.is_moving = False
+        return True
     
     # * === OTHER HELPERS ===
     def _cancel_temp_tasks(self):
@@ -304,22 +366,22 @@ class Enemy(Entity):
             self._damage_detection_task
         ]
         for task in tasks: attempt_cancel(task)
+        self.ai_scheduler.unregister(self)
     
-    def _is_player_in_range(self):
-        """Checks if the specifically targeted player is in range."""
-        if self.target is None: return False
-        
-        # We assume the target (Player) has a sprite and stack
-        p_w = self.target.sprite.width
-        p_h = self.target.sprite.height
-        
+    def _is_distant(self) -> bool:
+        """Returns `True` if the enemy was far from its target, on its last think tick."""
+        return self.target is not None and self._target_distance > DISTANT_RANGE
+    
+    def _is_target_in_range(self, target: TargetSnapshot | None) -> bool:
+        """Checks if the snapshot of the targeted player is in range."""
+        if target is None: return False
         return is_in_range(
             entity1_stack=self.stack, 
-            entity1_w=self.sprite.width, 
-            entity1_h=self.sprite.height,
-            entity2_stack=self.target.stack, 
-            entity2_w=p_w, 
-            entity2_h=p_h,
+            entity1_w=self.sprite.base_width, 
+            entity1_h=self.sprite.base_height,
+            entity2_stack=target, # ? Has the `left` and `bottom` of the target's stack
+            entity2_w=target.width, 
+            entity2_h=target.height,
             threshold=self.melee_range
         )
         
@@ -7,16 +7,26 @@ from typing import Self, Callable
 
 from images import Sprite
 from audio.audio_manager import AudioManager
+from audio.spatial import SpatialAudio
+from entities.state_machine import (
+    Action, ActionState, StateMachine, TransitionTable,
+    ATTACK_STATES, ENTITY_TABLE, STATE_FLAG_NAMES, STATE_FLAGS
+)
 from utilities.values import pathify
+from utilities.event_bus import EventBus, HitLanded, EntityDied, default_bus
+from utilities.combat import AttackSwing, SwingRules
+from hud import HUDManager, default_hud, make_nametag
+from load_governor import LoadGovernor, default_governor
+from utilities.lag_monitor import monitor as lag_monitor
 
 
 class Factions(Enum):
     HUMAN = "Human"
     NONHUMAN = "Non-Human"
 
-@dataclass
+@dataclass(slots=True)
 class EntityStates:
-    """Entity states or state data."""
+    """Entity states or state data. Slotted, since these are checked many times per tick."""
     is_moving: bool = False
     sprint: bool = False
     jumped: bool = False
@@ -28,8 +38,13 @@ class EntityStates:
     disable_movement: bool = False
     revivable: bool = False
     dealing_damage: bool = False
+    
+    def reset(self, **overrides):
+        """Resets all states back to their defaults in place, except for `overrides`."""
+        # ? Re-running the generated __init__ is the fastest way to assign every field
+        EntityStates.__init__(self, **overrides)
 
-@dataclass
+@dataclass(slots=True)
 class EntityStats:
     """Includes health, movement speed, etc."""
     health: float = 20
@@ -42,15 +57,24 @@ class EntityStats:
     jump_air_time: float = 0.1
     knockback_resistance: float = 1.0
     attack_knockback: int = 20
+    
+    def reset(self, base: Self = None, **overrides):
+        """
+        Resets all stats in place, back to the values of `base` (or the defaults),
+        except for `overrides`.
+        """
+        if base is not None:
+            overrides = {name: getattr(base, name) for name in EntityStats.__slots__} | overrides
+        EntityStats.__init__(self, **overrides)
 
-@dataclass
+@dataclass(slots=True)
 class HitboxPos:
     l_left: int = 0
     l_bottom: int = 0
     r_left: int = 0
     r_bottom: int = 0
 
-@dataclass
+@dataclass(slots=True)
 class Hitbox:
     faction: Factions
     attack_phases: dict[int, HitboxPos] = field(default_factory=lambda: {
@@ -59,104 +83,136 @@ class Hitbox:
     })
     current_atk_phase: int = 0
 
-@dataclass
+@dataclass(slots=True)
 class SimpleHitbox:
     positions: HitboxPos = field(default_factory=lambda: HitboxPos())
 
+def _resolve_hit(event: HitLanded):
+    """Combat subscriber, hands a dispatched hit over to its target."""
+    event.target._on_hit(event)
+
+@dataclass(frozen=True, slots=True)
+class FacingLayout:
+    """Precomputed hitbox offsets of an entity type for a single facing direction."""
+    self_hb: tuple[int, int] | None = None # (left, bottom)
+    atk_hb_lefts: tuple[int, ...] = ()
+
 class Entity:
     """Entity base class. Handles the sprite and some states."""
+    # ? Shared by all entities of the same type, see `_get_facing_layouts()`
+    _facing_layouts: dict[tuple[str, str], dict[int, FacingLayout]] = {}
+    # ? The actions this entity type can do, see `entities.state_machine`
+    _transition_table: TransitionTable = ENTITY_TABLE
+    # ? How many times each attack can land, see `utilities.combat`
+    _swing_rules: SwingRules = SwingRules()
+    
     def __init__(
         self, sprite: Sprite, name: str, page: ft.Page,
         audio_manager: AudioManager = None, faction: Factions = None,
         entity_list: list[Self] = None,
-        *, show_hud: bool = True, debug: bool = False, stats: EntityStats = None
+        *, show_hud: bool = True, debug: bool = False, stats: EntityStats = None,
+        event_bus: EventBus = None, hud_manager: HUDManager = None,
+        spatial_audio: SpatialAudio = None
     ):
         self.sprite = sprite
         self.name = name
         self.page = page
         self.audio_manager = audio_manager
+        self.spatial_audio: SpatialAudio = spatial_audio
         self.debug = debug
         self.faction: Factions = faction
         self._entity_list = entity_list if entity_list is not None else []
+        self.event_bus: EventBus = event_bus if event_bus is not None else default_bus
+        self.event_bus.subscribe(HitLanded, _resolve_hit)
+        self._last_hit: HitLanded = None
+        self._swing: AttackSwing = None
         if stats is None: stats = EntityStats()
         self._handler_str: str = "Entity"
         self.states: EntityStates = EntityStates()
+        self.fsm = StateMachine(
+            self._transition_table,
+            on_exit=self._on_state_exit, on_enter=self._on_state_enter
+        )
         self.stats: EntityStats = stats
+        self._base_stats: EntityStats = replace(stats)
         self._movement_loop_task: asyncio.Task = None
-        self._spr_path: Path = pathify(sprite.src)
+        self._spr_path: Path = pathify(sprite.base_src)
         self.health_bar: ft.ProgressBar = None
         self._health_bar_c: ft.Control = None
+        self._hud: ft.Control = None
         self.nametag: ft.Control = None
+        self.hud_manager: HUDManager = hud_manager if hud_manager is not None else default_hud
+        self.governor: LoadGovernor = default_governor
+        self._footsteps: int = 0
         self._show_border: bool = False
         self._cleanup_ready: bool = False
         if not hasattr(self, "_atk_hb_show"):
             self._atk_hb_show: bool = False
         self._atk_hitboxes: list[ft.Container] = []
         self._hitbox: ft.Container = None
+        self._self_hb_modified: bool = False
         self.ground_level: int = 0
         self.stack: ft.Stack = self._make_stack()
         print(f"Making a {faction.value} entity, named; \"{name}\"")
         if show_hud:
             self._health_bar_c = self._make_health_bar()
             self.nametag = self._make_nametag()
-            self.stack.controls.append(self._make_hud())
+            self._hud = self._make_hud()
+            self.stack.controls.append(self._hud)
+            self.hud_manager.register(self, cullable=faction != Factions.HUMAN)
             self._safe_update(self.stack)
     
     # * === DAMAGE HITBOXES ===
-    def _flip_atk_hb(self):
-        """Updates attack hitbox positions based on facing direction."""
-        if not self._atk_hitboxes: return
-
-        # If scale.x > 0, facing RIGHT. If < 0, facing LEFT.
-        is_facing_right = self.sprite.scale.scale_x > 0
-        for i, hb in enumerate(self._atk_hitboxes):
-            phase_id = i + 1 # Phase 1, Phase 2...
-            data: Hitbox = hb.data
-            
-            # Get the position config for this specific phase
-            pos_config: HitboxPos = data.attack_phases.get(phase_id)
-            if not pos_config: continue
-
-            if is_facing_right: hb.left = pos_config.r_left
-                # hb.bottom = pos_config.r_bottom # ? If vertical changes needed
-            else: hb.left = pos_config.l_left
-                # hb.bottom = pos_config.l_bottom
-
-        # Force visual update
-        self._safe_update(*self._atk_hitboxes)
+    def _get_facing_layouts(self) -> dict[int, FacingLayout]:
+        """
+        Returns the left/right hitbox layouts of this entity type.
+        They are built once from the default hitboxes, and then shared.
+        """
+        key = (type(self).__name__, self._spr_path.parent.as_posix())
+        layouts = Entity._facing_layouts.get(key)
+        if layouts is None:
+            layouts = {}
+            for direction in (1, -1):
+                self_hb = None
+                if self._hitbox is not None:
+                    pos: HitboxPos = self._default_self_hb_pos
+                    if direction > 0: self_hb = (pos.r_left, pos.r_bottom)
+                    else: self_hb = (pos.l_left, pos.l_bottom)
+                atk_hb_lefts = []
+                for i, hb in enumerate(self._atk_hitboxes):
+                    data: Hitbox = hb.data
+                    pos_config: HitboxPos = data.attack_phases.get(i + 1) # Phase 1, Phase 2...
+                    if pos_config is None: atk_hb_lefts.append(hb.left)
+                    else: atk_hb_lefts.append(pos_config.r_left if direction > 0 else pos_config.l_left)
+                layouts[direction] = FacingLayout(self_hb, tuple(atk_hb_lefts))
+            Entity._facing_layouts[key] = layouts
+        return layouts
     
-    def _flip_self_hb(self):
-        """Updates self hitbox positions based on facing direction."""
-        if self._hitbox is None or self._hitbox.data is None: return
-
-        # 1. Determine Direction
-        current_scale = self.sprite.scale.scale_x if hasattr(self.sprite.scale, "scale_x") else self.sprite.scale
-        is_facing_right = current_scale > 0
-        
-        # 2. Get Data
-        data: SimpleHitbox = self._hitbox.data
-        pos: HitboxPos = data.positions
-
-        # 3. Apply Offset
-        if is_facing_right:
-            self._hitbox.left = pos.r_left
-            self._hitbox.bottom = pos.r_bottom
-        else:
-            self._hitbox.left = pos.l_left
-            self._hitbox.bottom = pos.l_bottom
+    def _apply_facing_layout(self, direction: int):
+        """
+        Moves the hitboxes to the precomputed layout of the facing `direction`.
+        Nothing is updated here; the caller's update of `self.stack` carries the changes.
+        """
+        layout = self._get_facing_layouts()[direction]
+        for hb, left in zip(self._atk_hitboxes, layout.atk_hb_lefts): hb.left = left
+        if self._hitbox is None: return
         
-        # 4. Visual Update
-        self._safe_update(self._hitbox)
+        # ? A temporarily modified hurtbox has to use its current positions instead
+        if self._self_hb_modified:
+            pos: HitboxPos = self._hitbox.data.positions
+            if direction > 0: self._hitbox.left, self._hitbox.bottom = pos.r_left, pos.r_bottom
+            else: self._hitbox.left, self._hitbox.bottom = pos.l_left, pos.l_bottom
+        else: self._hitbox.left, self._hitbox.bottom = layout.self_hb
     
     def _make_self_hitbox(
         self, width: int = None, height: int = None,
         r_left: int = 0, bottom: int = 0
     ):
         """Makes the target-able hitbox and saves defaults."""
-        if width is None: width = self.sprite.width
-        if height is None: height = self.sprite.height
+        if width is None: width = self.sprite.base_width
+        if height is None: height = self.sprite.base_height
         
-        l_left = self.sprite.width - r_left - width
+        l_left = self.sprite.base_width - r_left - width
         
         # Create the Position Data
         pos_data = HitboxPos(
@@ -195,8 +251,8 @@ class Entity:
         These hitboxes must also have a `width` and a `height`.
         """
         hb_bottom = bottom
-        p1_l_left = self.sprite.width - p1_r_left - p1_width # Phase 1 Config
-        p2_l_left = self.sprite.width - p2_r_left - p2_width # Phase 2 Config
+        p1_l_left = self.sprite.base_width - p1_r_left - p1_width # Phase 1 Config
+        p2_l_left = self.sprite.base_width - p2_r_left - p2_width # Phase 2 Config
         
         hb_pos_data = {
             1: HitboxPos(
@@ -287,6 +343,7 @@ class Entity:
             pos.l_bottom = def_pos.l_bottom
             pos.r_left = def_pos.r_left
             pos.r_bottom = def_pos.r_bottom
+            self._self_hb_modified = False
             
             # Set local vars so visual update below works
             current_width = width
@@ -302,17 +359,17 @@ class Entity:
 
             # Update Internal Math
             pos.r_left = current_r_left
-            pos.l_left = self.sprite.width - current_r_left - current_width
+            pos.l_left = self.sprite.base_width - current_r_left - current_width
             pos.r_bottom = current_bottom
             pos.l_bottom = current_bottom
+            self._self_hb_modified = True
         
         # --- VISUAL UPDATE ---
         self._hitbox.width = current_width
         self._hitbox.height = current_height
         
         # Apply based on facing
-        current_scale = self.sprite.scale.scale_x if hasattr(self.sprite.scale, "scale_x") else self.sprite.scale
-        is_facing_right = current_scale > 0
+        is_facing_right = self.sprite.facing > 0
         
         if is_facing_right:
             self._hitbox.left = pos.r_left
@@ -331,10 +388,22 @@ class Entity:
             else: print(msg, end=end)
     
     def _play_sfx(self, sfx: Path, volume: float = None):
-        """Play an SFX with support for directional playback."""
-        right_vol = (self.stack.left + (self.sprite.width / 2)) / self.page.width
-        left_vol = 1.0 - right_vol
-        self.audio_manager.play_sfx(sfx, left_vol, right_vol, volume)
+        """
+        Play an SFX with support for directional playback. With a `SpatialAudio`, it's also
+        attenuated by the distance to the listener (and culled if inaudible).
+        """
+        center = self.stack.left + (self.sprite.base_width / 2)
+        with lag_monitor.section("audio"):
+            if self.spatial_audio is not None: return self.spatial_audio.emit(sfx, center, volume, emitter=self)
+            right_vol = center / self.page.width
+            self.audio_manager.play_sfx(sfx, 1.0 - right_vol, right_vol, volume)
+    
+    def _play_footstep(self, *sfx: Path, volume: float = None):
+        """Plays a footstep's SFX, thinned out by the current quality tier."""
+        stride = self.governor.tier.footstep_stride
+        self._footsteps += 1
+        if not stride or self._footsteps % stride: return
+        for sound in sfx: self._play_sfx(sound, volume)
     
     # * === MOVEMENT LOOP ===
     def _check_movement(
@@ -344,6 +413,7 @@ class Entity:
     ):
         """
         Checks for movement and applies them to the `self.stack`.
+        Turning around is not updated here, it is carried by the next update of `self.stack`.
         
         Args:
             primary_callback(Callable): This function is called if movement is detected.
@@ -357,8 +427,6 @@ class Entity:
             if primary_callback: primary_callback()
             
             if self._flip_sprite_x(dx):
-                self._flip_atk_hb()
-                self._flip_self_hb()
                 if secondary_callback: secondary_callback()
         else: self.states.is_moving = False
     
@@ -435,7 +503,7 @@ class Entity:
             return g_left, g_bottom, self._hitbox.width, self._hitbox.height
         else:
             # Fallback to Sprite bounds if no hitbox exists
-            return self.stack.left, self.stack.bottom, self.sprite.width, self.sprite.height
+            return self.stack.left, self.stack.bottom, self.sprite.base_width, self.sprite.base_height
     
     def _get_parent(self):
         """Returns the stack's parent, and assumes it's also a `Stack`."""
@@ -457,20 +525,7 @@ class Entity:
         )
     
     def _make_nametag(self):
-        outline_text = ft.Text(
-            value=self.name, size=20,
-            style=ft.TextStyle(
-                foreground=ft.Paint(
-                    color=ft.Colors.BLACK,
-                    stroke_width=4,
-                    style=ft.PaintingStyle.STROKE
-                )
-            ),
-        )
-        
-        solid_text = ft.Text(value=self.name, size=20, color=ft.Colors.WHITE)
-        
-        return ft.Stack([outline_text, solid_text])
+        return make_nametag(self.name)
     
     def _make_health_bar(self):
         healthbar = ft.ProgressBar(
@@ -496,10 +551,11 @@ class Entity:
         """Returns a stack positioned at the bottom-center of the screen."""
         self._debug_msg(f"Created Entity of faction: {self.faction}")
         return ft.Stack(
-            controls=[ft.Container(self.sprite, data=self.faction)],
-            left=(self.page.width / 2) - (self.sprite.width / 2), bottom=self.ground_level,
+            # ? Positioned, so the box of a pre-scaled sprite isn't clamped to the stack's size
+            controls=[ft.Container(self.sprite, data=self.faction, left=0, top=0)],
+            left=(self.page.width / 2) - (self.sprite.base_width / 2), bottom=self.ground_level,
             animate_position=ft.Animation(100, ft.AnimationCurve.EASE_IN_OUT),
-            width=self.sprite.width, height=self.sprite.height,
+            width=self.sprite.base_width, height=self.sprite.base_height,
             clip_behavior=ft.ClipBehavior.NONE
         )
     
@@ -509,40 +565,101 @@ class Entity:
         As of Flet version `0.70.0.dev6787`, accessing the `.page` property
         will raise a `RuntimeError` exception.
         """
-        for control in controls:
-            if control is None: continue
-            try: control.update()
-            except RuntimeError: pass
+        with lag_monitor.section("diffs"):
+            for control in controls:
+                if control is None: continue
+                try: control.update()
+                except RuntimeError: pass
     
-    async def _update_health_bar(self):
-        """Updates the health bar if provided."""
+    def _refresh_health_bar(self):
+        """Queues a health bar update (if provided), which is pushed with the next HUD batch."""
         if self.health_bar is None: return
-        await asyncio.sleep(0.1)
-        self.health_bar.value = abs((self.stats.health / self.stats.max_health) - 1)
-        self._safe_update(self.health_bar)
+        self.hud_manager.mark_dirty(self)
     
     def _flip_sprite_x(self, dx: int):
-        current_scale_x = self.sprite.scale.scale_x if hasattr(self.sprite.scale, "scale_x") else self.sprite.scale
-        start_facing_sign = 1 if current_scale_x > 0 else -1
+        """Turns the sprite and its hitboxes towards `dx`. Returns `True` if it has turned."""
+        start_facing_sign = self.sprite.facing
         desired_sign = start_facing_sign
         if dx > 0: desired_sign = 1
         elif dx < 0: desired_sign = -1
-        has_flipped = False
-        if desired_sign != start_facing_sign:
-            self.sprite.flip_x(desired_sign)
-            has_flipped = True
-        return has_flipped
+        if desired_sign == start_facing_sign: return False
+        self.sprite.flip_x(desired_sign, update_ctrl=False)
+        self._apply_facing_layout(desired_sign)
+        return True
     
     # * === OTHER HELPERS ===
-    def _reset_states(self, new_states: EntityStates = None):
-        """Reset entity state values back to their defaults."""
-        if new_states is None: new_states = EntityStates()
-        self.states = new_states
+    def _reset_states(self, **overrides):
+        """Reset entity state values back to their defaults (in place)."""
+        self.states.reset(**overrides)
     
-    def _reset_stats(self, new_stats: EntityStates = None):
-        """Reset entity statistics back to their defaults."""
-        if new_stats is None: new_stats = EntityStats()
-        self.stats = new_stats
+    def _reset_stats(self, **overrides):
+        """Reset entity statistics back to their initial values (in place)."""
+        self.stats.reset(self._base_stats, **overrides)
+    
+    # * === STATE MACHINE HOOKS ===
+    def _sync_state_flags(self):
+        """Sets the state flags owned by the state machine to match its current state."""
+        flags = STATE_FLAGS[self.fsm.state]
+        for name in STATE_FLAG_NAMES: setattr(self.states, name, name in flags)
+    
+    def _on_state_exit(self, prev: ActionState, new: ActionState):
+        """
+        Called before leaving the `prev` state.
+        Cleans up after an attack, even if its task was cancelled midway.
+        """
+        if prev in ATTACK_STATES and new not in ATTACK_STATES:
+            self.states.dealing_damage = False
+            self._swing = None
+            self._modify_self_hitbox(reset=True)
+    
+    def _on_state_enter(self, prev: ActionState, new: ActionState):
+        """Called after entering the `new` state. Subclasses start their animations here."""
+        self._debug_msg(f"State: {prev.name} -> {new.name}")
+        if new in ATTACK_STATES and prev not in ATTACK_STATES:
+            self._swing = AttackSwing(self, self._swing_rules)
+        elif new is ActionState.DYING:
+            self._reset_states(dead=True)
+            self.event_bus.publish(EntityDied(self))
+        self._sync_state_flags()
+        if prev in ATTACK_STATES or new in ATTACK_STATES or new is ActionState.DYING:
+            self._toggle_atk_hb_border()
+    
+    # * === COMBAT ===
+    def _register_hit(self, target: Self) -> int | None:
+        """
+        Records a hit of the current attack swing on `target`.
+        Returns the swing's ID, or `None` if the swing can't hit `target` (again).
+        """
+        if self._swing is None or not self._swing.register(target): return None
+        return self._swing.swing_id
+    
+    def _apply_damage(self, damage_amount: float) -> bool:
+        """
+        Decreases the health, and starts taking damage if it's still alive.
+        Returns `False` if it can't be damaged. Dying is left to the caller.
+        """
+        if not self._can(Action.TAKE_DAMAGE, "be damaged"): return False
+        self.stats.health -= damage_amount
+        self._debug_msg(f"HP: {self.stats.health}/{self.stats.max_health}(-{damage_amount})")
+        if self.stats.health > 0: self.fsm.fire(Action.TAKE_DAMAGE)
+        return True
+    
+    def _on_hit(self, event: HitLanded) -> bool:
+        """
+        Resolves a dispatched hit on this entity. A task is only spawned if it dies.
+        Returns `False` if the hit was ignored.
+        """
+        self._last_hit = event
+        if not self._apply_damage(event.damage): return False
+        if self.stats.health <= 0: self.page.run_task(self.death)
+        else: self._refresh_health_bar()
+        return True
+    
+    def _can(self, action: Action, action_str: str) -> bool:
+        """Returns `True` if `action` is allowed, otherwise logs why it's not."""
+        if self.fsm.can(action): return True
+        self._debug_msg(f"{self.name} cannot {action_str} while {self.fsm.state.name.lower()}")
+        return False
     
     # * === CALLABLE ACTIONS/EVENTS ===
     def __call__(self):
@@ -557,16 +674,7 @@ class Entity:
         Simple spam-proof implementation for `attack()`.
         Returns `False` if action is interrupted.
         """
-        if self.states.is_attacking:
-            self._debug_msg(f"{self.name} is already attacking")
-            return False
-        if self.states.dead:
-            self._debug_msg(f"{self.name} cannot attack while dead")
-            return False
-        if self.states.taking_damage:
-            self._debug_msg(f"{self.name} cannot attack while being damaged")
-            return False
-        return True
+        return self._can(Action.ATTACK, "attack")
         # ? Implement the rest of the logic here
     
     def take_damage(self):
@@ -574,13 +682,7 @@ class Entity:
         Simple spam-proof implementation for `take_damage()`.
         Returns `False` if action is interrupted.
         """
-        if self.states.dead:
-            self._debug_msg(f"{self.name} is already dead")
-            return False
-        if self.states.taking_damage:
-            self._debug_msg(f"{self.name} cannot be damaged again yet")
-            return False
-        return True
+        return self._can(Action.TAKE_DAMAGE, "be damaged")
         # ? Implement the rest of the logic here
     
     def death(self):
@@ -588,10 +690,7 @@ class Entity:
         Simple spam-proof implementation for `death()`.
         Returns `False` if action is interrupted.
         """
-        if self.states.dead:
-            self._debug_msg(f"{self.name} is already dead")
-            return False
-        return True
+        return self._can(Action.DIE, "die")
         # ? Implement the rest of the logic here
         
     def revive(self):
@@ -599,11 +698,5 @@ class Entity:
         Simple spam-proof implementation for `revive()`.
         Returns `False` if action is interrupted.
         """
-        if not self.states.dead:
-            self._debug_msg(f"{self.name} is not dead")
-            return False
-        elif not self.states.revivable:
-            self._debug_msg(f"{self.name} is not yet ready to be revived")
-            return False
-        return True
+        return self._can(Action.REVIVE, "be revived")
         # ? Implement the rest of the logic here
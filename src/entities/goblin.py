@@ -2,13 +2,22 @@ import flet as ft
 
 from entities.enemy import Enemy, EnemyType
 from audio.audio_manager import AudioManager
+from audio.spatial import SpatialAudio
+from utilities.event_bus import EventBus
+from hud import HUDManager
 
 # TODO: Make a Goblin class that will inherit from the Enemy class
 
 class Goblin(Enemy):
     def __init__(
         self, type: EnemyType, page: ft.Page, audio_manager: AudioManager,
-        target: Enemy = None, name: str = None, *, debug: bool = False
+        target: Enemy = None, name: str = None, *, debug: bool = False,
+        event_bus: EventBus = None, hud_manager: HUDManager = None,
+        spatial_audio: SpatialAudio = None
     ):
-        super().__init__(type, page, audio_manager, target, name, debug=debug)
+        super().__init__(
+            type, page, audio_manager, target, name,
+            debug=debug, event_bus=event_bus, hud_manager=hud_manager,
+            spatial_audio=spatial_audio
+        )
     
\ No newline at end of file
@@ -1,23 +1,30 @@
 import asyncio, random
 import flet as ft
-from pynput import keyboard
 
-from entities.entity import Entity, EntityStates, EntityStats, Factions
+from entities.entity import Entity, Factions
+from entities.state_machine import Action, ActionState, ATTACK_STATES, JUMP_STATES, PLAYER_TABLE
 from images import Sprite
 from audio.audio_manager import AudioManager
+from audio.spatial import SpatialAudio
 from audio.sfx_data import SFXLibrary
-from utilities.keyboard_manager import held_keys
-from utilities.tasks import attempt_cancel
+from utilities.keyboard_manager import InputManager, InputSnapshot, input_manager as default_input, pynput
+from utilities.tasks import attempt_cancel, name_current_task
 from utilities.collisions import check_collision
+from utilities.input_buffer import InputBuffer
+from hud import HUDManager
+from utilities.event_bus import EventBus, HitLanded
 
 sfx = SFXLibrary()
 
 class Player(Entity):
     """Handles the player's actions and states."""
+    _transition_table = PLAYER_TABLE
+    
     def __init__(
         self, page: ft.Page, audio_manager: AudioManager,
-        held_keys: set = set(), entity_list: list[Entity] = None,
-        *, debug: bool = False
+        input_manager: InputManager = None, entity_list: list[Entity] = None,
+        *, debug: bool = False, event_bus: EventBus = None, hud_manager: HUDManager = None,
+        spatial_audio: SpatialAudio = None
     ):
         sprite = Sprite(
             src="images/player/idle_0.png", width=180, height=180,
@@ -27,9 +34,12 @@ class Player(Entity):
         super().__init__(
             sprite=sprite, name=self.name, page=page,
             audio_manager=audio_manager, faction=Factions.HUMAN,
-            entity_list=entity_list, debug=debug
+            entity_list=entity_list, debug=debug, event_bus=event_bus, hud_manager=hud_manager,
+            spatial_audio=spatial_audio
         )
-        self.held_keys = held_keys
+        self.input_manager: InputManager = input_manager if input_manager is not None else default_input
+        self.input_buffer: InputBuffer = InputBuffer(self.fsm.can)
+        self._bind_keys()
         self._handler_str = "Player"
         self._jump_task: asyncio.Task = None
         self._attack_task: asyncio.Task = None
@@ -44,6 +54,7 @@ class Player(Entity):
     # * === LOOPING ANIMATIONS ===
     async def _animation_loop(self):
         """Handles the player's different animation loops."""
+        name_current_task(f"{self._handler_str}.animation_loop")
         index: int = 0
         while not self.states.dead:
             # Give way to other animations
@@ -63,12 +74,8 @@ class Player(Entity):
                 wait_time = 0.05 if self.states.sprint else 0.075
                 await asyncio.sleep(wait_time)
                 self.sprite.change_src(self._get_spr_path("run", index))
-                if index == 2:
-                    self._play_sfx(sfx.armor.rustle_2, 0.2)
-                    self._play_sfx(sfx.footsteps.footstep_grass_1, 0.2)
-                if index == 5:
-                    self._play_sfx(sfx.armor.rustle_3, 0.2)
-                    self._play_sfx(sfx.footsteps.footstep_grass_2, 0.2)
+                if index == 2: self._play_footstep(sfx.armor.rustle_2, sfx.footsteps.footstep_grass_1, volume=0.2)
+                if index == 5: self._play_footstep(sfx.armor.rustle_3, sfx.footsteps.footstep_grass_2, volume=0.2)
                 
             # Idle animation
             elif not self.states.is_moving and not self.states.is_falling:
@@ -83,9 +90,12 @@ class Player(Entity):
         self._animation_loop_task = self.page.run_task(self._animation_loop)
     
     # * === DAMAGE DETECTION ===
-    async def _detect_damage(self):
-        """Checks if any hostile entity is attacking and colliding with the player."""
-        if self._entity_list is None or self.states.dead or self.states.taking_damage: return
+    def _detect_damage(self):
+        """
+        Checks if any hostile entity is attacking and colliding with the player.
+        Hits are published, and resolved when the event bus dispatches them.
+        """
+        if self._entity_list is None or not self.fsm.can(Action.TAKE_DAMAGE): return
         
         # Get Player's Body Rect
         p_left, p_bottom, p_w, p_h = self._get_self_global_rect()
@@ -111,16 +121,21 @@ class Player(Entity):
                         r1_left=p_left, r1_bottom=p_bottom, r1_w=p_w, r1_h=p_h, # Player Body
                         r2_left=e_hb_left, r2_bottom=e_hb_bottom, r2_w=atk_hb.width, r2_h=atk_hb.height # Enemy Weapon
                     ):
+                        swing_id = entity._register_hit(self)
+                        if swing_id is None: continue # ? Already hit by this swing
                         self._debug_msg(f"Hit by {entity.name}!")
-                        await self.take_damage(entity.stats.attack_damage)
-                        self._knockback_self(entity)
+                        self.event_bus.publish(HitLanded(
+                            entity, self, entity.stats.attack_damage, entity.states.attack_phase, swing_id
+                        ))
                         return
     
-    async def _detect_attack_hits(self):
+    def _detect_attack_hits(self):
         """
         Checks if the Player's active attack hitbox collides with any enemy.
+        Hits are published, and resolved when the event bus dispatches them.
         """
         if not self.states.dealing_damage or not self._entity_list: return
+        if self._swing is None or self._swing.spent: return
         
         # ... (Get Active Hitbox logic) ...
         hb_index = self.states.attack_phase - 1
@@ -140,32 +155,38 @@ class Player(Entity):
                 r1_left=w_left, r1_bottom=w_bottom, r1_w=active_hb.width, r1_h=active_hb.height, # Player Weapon
                 r2_left=e_left, r2_bottom=e_bottom, r2_w=e_w, r2_h=e_h # Enemy Body
             ):
+                swing_id = self._register_hit(enemy)
+                if swing_id is None: continue # ? Already hit by this swing
                 self._debug_msg(f"Hit enemy: {enemy.name}")
-                self.page.run_task(enemy.take_damage, self.stats.attack_damage)
+                self.event_bus.publish(HitLanded(
+                    self, enemy, self.stats.attack_damage, self.states.attack_phase, swing_id
+                ))
     
     # * === CUSTOM MOVEMENT LOOP ===
     async def _movement_loop(self):
         """Handles player movements."""
+        name_current_task(f"{self._handler_str}.movement_loop")
         while True:
-            await self._detect_attack_hits()
-            await self._detect_damage()
+            self._detect_attack_hits()
+            self._detect_damage()
             if self.states.dead or self.states.disable_movement:
                 self.states.is_moving = False
                 await asyncio.sleep(0.1)
                 continue
             
-            is_shift_held = keyboard.Key.shift in self.held_keys
-            # is_ctrl_held = keyboard.Key.ctrl_l in keyboard_manager.held_keys # ? Enable if needed
-            if self.page.window.focused and \
-            (not self.states.is_attacking and not self.states.taking_damage):
+            keys: InputSnapshot = self.input_manager.poll()
+            self.input_buffer.update()
+            is_shift_held = pynput.keyboard.Key.shift in keys
+            # is_ctrl_held = keyboard.Key.ctrl_l in keys # ? Enable if needed
+            if self.page.window.focused and self.fsm.can(Action.MOVE):
                 step = self.stats.movement_speed * 2 if is_shift_held else self.stats.movement_speed
                 dx, dy = 0, 0
                 
-                # if 'w' in keyboard_manager.held_keys: dy -= step # ? Use for flying upwards
-                # if 's' in keyboard_manager.held_keys: dy += step # ? Use for flying downwards
-                if 'a' in self.held_keys: dx -= step
-                if 'd' in self.held_keys: dx += step
-                if (self.stack.left + dx) <= 0 or (self.stack.left + dx + self.sprite.width) >= self.page.width: dx = 0
+                # if 'w' in keys: dy -= step # ? Use for flying upwards
+                # if 's' in keys: dy += step # ? Use for flying downwards
+                if 'a' in keys: dx -= step
+                if 'd' in keys: dx += step
+                if (self.stack.left + dx) <= 0 or (self.stack.left + dx + self.sprite.base_width) >= self.page.width: dx = 0
                 
                 # ? Movement
                 def primary_callback(): self.states.sprint = True if is_shift_held else False
@@ -218,8 +239,8 @@ class Player(Entity):
             if self.states.is_attacking: continue # ? Skips animation if attacking mid-air
             self.sprite.change_src(self._get_spr_path("jump", i))
         await asyncio.sleep(self.stats.jump_air_time)
-        self.states.jumped = False
         self._jump_task = None
+        self.fsm.fire(Action.LAND)
     
     async def _attack_anim(self):
         """Handles the player's attack animations with combos."""
@@ -245,10 +266,8 @@ class Player(Entity):
                 self.states.dealing_damage = False
                 self._toggle_atk_hb_border()
             self.sprite.change_src(self._get_spr_path(prefix, i))
-        self._modify_self_hitbox(reset=True)
-        self.states.is_attacking = False
         self._attack_task = None
-        self._toggle_atk_hb_border()
+        self.fsm.fire(Action.RECOVER)
     
     async def _death_anim(self):
         """Handles the player's death animation."""
@@ -262,7 +281,7 @@ class Player(Entity):
                 self._play_sfx(sfx.item.keys_drop)
                 self._play_sfx(sfx.sword.blade_drop)
             self.sprite.change_src(self._get_spr_path("death", i))
-        self.states.revivable = True
+        self.fsm.fire(Action.SETTLE)
     
     async def _take_hit_anim(self):
         """Handles the player's taking damage animation."""
@@ -270,30 +289,61 @@ class Player(Entity):
             await asyncio.sleep(0.1)
             if i == 1: self._play_sfx(sfx.player.grunt_hurt)
             self.sprite.change_src(self._get_spr_path("take-hit", i))
-        self.states.taking_damage = False
         self._take_hit_task = None
+        self.fsm.fire(Action.RECOVER)
+    
+    # * === STATE MACHINE HOOKS ===
+    def _on_state_exit(self, prev: ActionState, new: ActionState):
+        """Cancels the animation of the action that is being left or interrupted."""
+        super()._on_state_exit(prev, new)
+        if prev in ATTACK_STATES and new not in ATTACK_STATES: attempt_cancel(self._attack_task)
+        if prev in JUMP_STATES and new not in JUMP_STATES: attempt_cancel(self._jump_task)
+        if prev is ActionState.TAKING_DAMAGE: attempt_cancel(self._take_hit_task)
+    
+    def _on_state_enter(self, prev: ActionState, new: ActionState):
+        """Starts the animation of the action that has been entered."""
+        super()._on_state_enter(prev, new)
+        # ? Buffered inputs are performed once out of the hook, the transition must finish first
+        if new is ActionState.DYING:
+            self.input_buffer.clear()
+            self.unbind_keys()
+        else: self.input_buffer.schedule_update()
+        if new in ATTACK_STATES and prev not in ATTACK_STATES:
+            self._attack_task = self.page.run_task(self._attack_anim)
+        elif new is ActionState.JUMPING and prev is ActionState.IDLE:
+            self._jump_task = self.page.run_task(self._jump_anim)
+        elif new is ActionState.TAKING_DAMAGE:
+            self._take_hit_task = self.page.run_task(self._take_hit_anim)
+        elif new is ActionState.DYING:
+            attempt_cancel(self._animation_loop_task)
+            self._cancel_temp_tasks()
     
     # * === CALLABLE PLAYER ACTIONS/EVENTS ===
     async def death(self):
         """Cancels all running tasks, and plays the death animation."""
         if not super().death(): return
         self._debug_msg(f"{self.name} has died!")
-        self._reset_states(EntityStates(dead=True))
-        self._reset_stats(EntityStats(health=0))
-        await self._update_health_bar()
-        
-        attempt_cancel(self._animation_loop_task)
-        self._cancel_temp_tasks()
+        self.fsm.fire(Action.DIE)
+        self._reset_stats(health=0)
+        self._refresh_health_bar()
         await self._death_anim()
-        self._toggle_atk_hb_border()
+    
+    # * === INPUT ===
+    # ? Presses made while the action isn't allowed yet are buffered (i.e.: the next combo phase)
+    def _on_jump_key(self):
+        if self.page.window.focused: self.input_buffer.press(Action.JUMP, self.jump, ready=self._is_grounded)
+    
+    def _on_attack_key(self):
+        if self.page.window.focused: self.input_buffer.press(Action.ATTACK, self.attack)
+    
+    def _is_grounded(self) -> bool: return self.stack.bottom == 0
     
     def jump(self):
         """Play jump action."""
-        if self.stack.bottom != 0 or self._interrupt_action(): return
+        if not self._is_grounded() or not self.fsm.can(Action.JUMP): return
         self.stack.bottom += self._get_jump_dy()
         self._safe_update(self.stack)
-        self.states.jumped = True
-        self._jump_task = self.page.run_task(self._jump_anim)
+        self.fsm.fire(Action.JUMP)
     
     def attack(self):
         """Player attack. Combo cycles: 1 -> 2 -> 1."""
@@ -301,35 +351,31 @@ class Player(Entity):
         self.states.attack_phase += 1
         if self.states.attack_phase > 2 or self.states.jumped: self.states.attack_phase = 1
         self._debug_msg(f"Attacking! Phase: {self.states.attack_phase}")
-        self.states.is_attacking = True
-        self._attack_task = self.page.run_task(self._attack_anim)
+        self.fsm.fire(Action.ATTACK)
         
     async def take_damage(self, damage_amount: float):
         """Decrease player's health with logic."""
-        if not super().take_damage(): return
-        self.stats.health -= damage_amount
-        self._debug_msg(f"Took damage: {damage_amount}, health is now: {self.stats.health}")
-        self.states.taking_damage = True
-        if (self.states.is_attacking and self.states.jumped) or self.states.is_attacking:
-            attempt_cancel(self._attack_task)
-            self.states.is_attacking = False
-            self.states.dealing_damage = False
-            self._toggle_atk_hb_border()
-            self._modify_self_hitbox(reset=True)
-            self._safe_update(self.stack)
+        self._last_hit = None
+        if not self._apply_damage(damage_amount): return
         if self.stats.health <= 0: await self.death()
-        else: self._take_hit_task = self.page.run_task(self._take_hit_anim)
-        await self._update_health_bar()
+        self._refresh_health_bar()
+    
+    def _on_hit(self, event: HitLanded) -> bool:
+        """Resolves a dispatched hit, and knocks the player back from the attacker."""
+        if not super()._on_hit(event): return False
+        self._knockback_self(event.attacker)
+        return True
     
     async def revive(self):
         if not super().revive(): return
-        self.states.revivable = False
+        self.fsm.fire(Action.REVIVE)
         self._debug_msg(f"Reviving: {self.name}")
         await self._revive_anim()
         self._reset_states()
+        self.fsm.fire(Action.RECOVER)
         self._reset_stats()
         attempt_cancel(self._movement_loop_task)
-        await self._update_health_bar()
+        self._refresh_health_bar()
         self._start_loops()
     
     def __call__(self, start_loops: bool = True):
@@ -341,6 +387,15 @@ class Player(Entity):
         return super().__call__()
     
     # * === OTHER HELPERS ===
+    def _bind_keys(self):
+        self.input_manager.bind(pynput.keyboard.Key.space, self._on_jump_key)
+        self.input_manager.bind("v", self._on_attack_key)
+    
+    def unbind_keys(self):
+        """Unbinds the keys of this player (i.e.: once dead, or on cleanup), as the input manager outlives it."""
+        self.input_manager.unbind(pynput.keyboard.Key.space, self._on_jump_key)
+        self.input_manager.unbind("v", self._on_attack_key)
+    
     def _cancel_temp_tasks(self):
         """Cancels all running temporary tasks."""
         tasks = [
@@ -358,15 +413,7 @@ class Player(Entity):
         """
         Returns `False` if there are no interrupting actions occurring.
         """
-        if (
-            self.states.is_attacking
-            or self.states.jumped
-            or self.states.taking_damage
-            or self.states.dead
-        ): return True
-        else:
-            self._cancel_temp_tasks()
-            return False
+        return self.fsm.state is not ActionState.IDLE
     
     def _get_jump_dy(self):
         """Returns the total jump distance."""
@@ -0,0 +1,151 @@
+from enum import Enum, Flag, auto
+from typing import Callable
+
+
+class Action(Flag):
+    """Actions (or events) that an entity's state machine reacts to."""
+    MOVE = auto()
+    JUMP = auto()
+    ATTACK = auto()
+    TAKE_DAMAGE = auto()
+    DIE = auto()
+    REVIVE = auto()
+    LAND = auto()       # A jump has finished
+    RECOVER = auto()    # A one-shot action (attack, taking damage, revival) has finished
+    SETTLE = auto()     # The death animation has finished
+    DESPAWN = auto()
+
+class ActionState(Enum):
+    """The action an entity is currently doing."""
+    IDLE = auto()
+    JUMPING = auto()
+    ATTACKING = auto()
+    AIR_ATTACKING = auto()
+    TAKING_DAMAGE = auto()
+    DYING = auto()
+    DOWNED = auto()     # Dead, but can be revived
+    REVIVING = auto()
+    DESPAWNED = auto()
+
+ATTACK_STATES = {ActionState.ATTACKING, ActionState.AIR_ATTACKING}
+JUMP_STATES = {ActionState.JUMPING, ActionState.AIR_ATTACKING}
+
+# The `EntityStates` flags that are owned by the state machine, and the ones set in each state
+STATE_FLAG_NAMES = ("is_attacking", "jumped", "taking_damage", "dead", "revivable")
+STATE_FLAGS: dict[ActionState, frozenset[str]] = {
+    ActionState.IDLE: frozenset(),
+    ActionState.JUMPING: frozenset({"jumped"}),
+    ActionState.ATTACKING: frozenset({"is_attacking"}),
+    ActionState.AIR_ATTACKING: frozenset({"is_attacking", "jumped"}),
+    ActionState.TAKING_DAMAGE: frozenset({"taking_damage"}),
+    ActionState.DYING: frozenset({"dead"}),
+    ActionState.DOWNED: frozenset({"dead", "revivable"}),
+    ActionState.REVIVING: frozenset({"dead"}),
+    ActionState.DESPAWNED: frozenset({"dead"}),
+}
+
+Transitions = dict[ActionState, dict[Action, ActionState]]
+
+class TransitionTable:
+    """
+    A compiled transition table. Transitions are looked up with a single `dict` access,
+    and the allowed actions of each state are kept as an `Action` mask.
+    """
+    def __init__(self, transitions: Transitions):
+        self.transitions: Transitions = transitions
+        self._next: dict[tuple[ActionState, Action], ActionState] = {
+            (state, action): next_state
+            for state, actions in transitions.items()
+            for action, next_state in actions.items()
+        }
+        self.masks: dict[ActionState, Action] = {state: Action(0) for state in ActionState}
+        for (state, action) in self._next: self.masks[state] |= action
+
+    def get(self, state: ActionState, action: Action) -> ActionState | None:
+        """Returns the state that `action` leads to from `state`, or `None` if it's blocked."""
+        return self._next.get((state, action))
+
+    def extend(self, transitions: Transitions, *, remove: Action = Action(0)) -> "TransitionTable":
+        """Returns a new table with the added `transitions`, and without the `remove` actions."""
+        merged: Transitions = {}
+        for state in ActionState:
+            actions = self.transitions.get(state, {}) | transitions.get(state, {})
+            merged[state] = {action: nxt for action, nxt in actions.items() if not action & remove}
+        return TransitionTable(merged)
+
+class StateMachine:
+    """
+    Table-driven state machine for an entity's actions.\n
+    `on_exit(prev, new)` is called before leaving a state, and `on_enter(prev, new)` after
+    entering the new one. Actions that map a state onto itself are allowed, but fire no hooks.
+    """
+    def __init__(
+        self, table: TransitionTable, initial: ActionState = ActionState.IDLE, *,
+        on_exit: Callable[[ActionState, ActionState], None] = None,
+        on_enter: Callable[[ActionState, ActionState], None] = None
+    ):
+        self.table = table
+        self.state = initial
+        self.on_exit = on_exit
+        self.on_enter = on_enter
+
+    def can(self, action: Action) -> bool:
+        """Returns `True` if `action` is allowed in the current state."""
+        return bool(self.table.masks[self.state] & action)
+
+    def fire(self, action: Action) -> bool:
+        """Transitions with `action`. Returns `False` if the action is blocked."""
+        prev = self.state
+        new = self.table.get(prev, action)
+        if new is None: return False
+        if new is prev: return True
+        if self.on_exit: self.on_exit(prev, new)
+        self.state = new
+        if self.on_enter: self.on_enter(prev, new)
+        return True
+
+# * === TRANSITION TABLES ===
+ENTITY_TABLE = TransitionTable({
+    ActionState.IDLE: {
+        Action.MOVE: ActionState.IDLE,
+        Action.ATTACK: ActionState.ATTACKING,
+        Action.TAKE_DAMAGE: ActionState.TAKING_DAMAGE,
+        Action.DIE: ActionState.DYING,
+    },
+    ActionState.ATTACKING: {
+        Action.RECOVER: ActionState.IDLE,
+        Action.TAKE_DAMAGE: ActionState.TAKING_DAMAGE,
+        Action.DIE: ActionState.DYING,
+    },
+    ActionState.TAKING_DAMAGE: {
+        Action.RECOVER: ActionState.IDLE,
+        Action.DIE: ActionState.DYING,
+    },
+    ActionState.DYING: {Action.SETTLE: ActionState.DOWNED},
+    ActionState.DOWNED: {
+        Action.REVIVE: ActionState.REVIVING,
+        Action.DESPAWN: ActionState.DESPAWNED,
+    },
+    ActionState.REVIVING: {Action.RECOVER: ActionState.IDLE},
+})
+
+# ? Enemies are despawned instead of being revived
+ENEMY_TABLE = ENTITY_TABLE.extend({}, remove=Action.REVIVE)
+
+# ? The player can also jump, and attack while mid-air
+PLAYER_TABLE = ENTITY_TABLE.extend({
+    ActionState.IDLE: {Action.JUMP: ActionState.JUMPING},
+    ActionState.JUMPING: {
+        Action.MOVE: ActionState.JUMPING,
+        Action.ATTACK: ActionState.AIR_ATTACKING,
+        Action.LAND: ActionState.IDLE,
+        Action.TAKE_DAMAGE: ActionState.TAKING_DAMAGE,
+        Action.DIE: ActionState.DYING,
+    },
+    ActionState.AIR_ATTACKING: {
+        Action.LAND: ActionState.ATTACKING,
+        Action.RECOVER: ActionState.JUMPING,
+        Action.TAKE_DAMAGE: ActionState.TAKING_DAMAGE,
+        Action.DIE: ActionState.DYING,
+    },
+}, remove=Action.DESPAWN)
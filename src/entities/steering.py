@@ -0,0 +1,89 @@
+import math
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Hashable, Iterable, Iterator
+
+
+@dataclass(frozen=True, slots=True)
+class SteeringParams:
+    """
+    Tuning of the crowd steering, distances are in px between the centers.\n
+    The first slot of each side is `slot_offset` (times the agent's melee range) from the target,
+    the next ones are queued `slot_spacing` further out.
+    """
+    slot_offset: float = 0.6
+    slot_spacing: float = 75
+    arrival_radius: float = 90      # Agents slow down within it, as they reach their slot
+    separation_radius: float = 60   # Agents closer than it push each other apart
+    separation_weight: float = 0.5
+    deadzone: float = 4             # Agents closer than it to their slot stand still
+
+@dataclass(frozen=True, slots=True)
+class Agent:
+    key: Hashable
+    x: float            # Center
+    speed: float        # Max step, per base think interval
+    melee_range: float
+
+@dataclass(frozen=True, slots=True)
+class Steer:
+    dx: float   # Step towards the slot, per base think interval
+    side: int   # -1 (left of the target) or 1 (right)
+    slot: int   # 0 is the attack slot, the others are queued behind it
+
+class SpatialHash:
+    """A uniform grid over the x-axis, for the neighbours queries of the agents."""
+    def __init__(self, cell_size: float):
+        self.cell_size = cell_size
+        self._cells: defaultdict[int, list[tuple[Hashable, float]]] = defaultdict(list)
+
+    def build(self, items: Iterable[tuple[Hashable, float]]):
+        self._cells.clear()
+        for key, x in items: self._cells[int(x // self.cell_size)].append((key, x))
+
+    def query(self, x: float, radius: float) -> Iterator[tuple[Hashable, float]]:
+        """Yields the items within `radius` of `x`."""
+        first, last = int((x - radius) // self.cell_size), int((x + radius) // self.cell_size)
+        for cell in range(first, last + 1):
+            for key, other_x in self._cells.get(cell, ()):
+                if abs(other_x - x) <= radius: yield key, other_x
+
+class CrowdSteering:
+    """
+    Spreads the agents chasing a same target into slots on both of its sides, instead of a pile.\n
+    Agents keep their side, and are ranked by their distance to the target: the closest one takes
+    the attack slot, the others queue in the next slots. They arrive to their slot (slowing down
+    in its `arrival_radius`), while being pushed apart from their neighbours. Every agent's step is
+    computed in a single pass, with the neighbours found through a `SpatialHash`.
+    """
+    def __init__(self, params: SteeringParams = None):
+        self.params = params if params is not None else SteeringParams()
+        self._grid = SpatialHash(self.params.separation_radius)
+
+    def plan(self, agents: list[Agent], target_x: float) -> dict[Hashable, Steer]:
+        """Returns the step of every agent chasing a target centered on `target_x`."""
+        p = self.params
+        self._grid.build((agent.key, agent.x) for agent in agents)
+        sides: dict[int, list[Agent]] = {-1: [], 1: []}
+        for agent in agents: sides[-1 if agent.x < target_x else 1].append(agent)
+
+        steers: dict[Hashable, Steer] = {}
+        for side, members in sides.items():
+            members.sort(key=lambda agent: abs(agent.x - target_x))
+            for slot, agent in enumerate(members):
+                slot_x = target_x + side * (agent.melee_range * p.slot_offset + slot * p.slot_spacing)
+                # ? Arrival
+                offset = slot_x - agent.x
+                if abs(offset) <= p.deadzone: seek = 0.0
+                else: seek = max(-1.0, min(offset / p.arrival_radius, 1.0))
+                # ? Separation
+                push = 0.0
+                for key, other_x in self._grid.query(agent.x, p.separation_radius):
+                    if key == agent.key: continue
+                    gap = agent.x - other_x
+                    # ? Stacked agents are split by their order
+                    direction = math.copysign(1.0, gap) if gap else (1.0 if id(agent.key) > id(key) else -1.0)
+                    push += direction * (1 - abs(gap) / p.separation_radius)
+                dx = (seek + push * p.separation_weight) * agent.speed
+                steers[agent.key] = Steer(max(-agent.speed, min(dx, agent.speed)), side, slot)
+        return steers
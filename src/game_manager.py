@@ -3,36 +3,57 @@ import asyncio, random
 
 from audio.audio_manager import AudioManager
 from audio.music_data import MusicLibrary
-from utilities.keyboard_manager import held_keys, start as km_start
+from audio.music_streamer import Mood, MusicStreamer
+from audio.spatial import SpatialAudio
+from audio.sfx_data import all_sfx
+from utilities.keyboard_manager import InputManager, input_manager, load_pynput
 from utilities.tasks import attempt_cancel
 from entities.player import Player
 from entities.enemy import Enemy, EnemyType
 from entities.entity import Entity
+from utilities.event_bus import EventBus, EntityDied, Panned, Spawned
 from bg_loops import light_mv_loop, stage_panning_loop
-from backgrounds import bg_image_forest
+from hud import HUDManager
+from spawn_director import SpawnDirector
+from entities.ai_scheduler import AIScheduler, default_scheduler
+from entities.attack_tokens import AttackTokenManager, default_tokens
+from load_governor import QualityTier, default_governor
+from utilities.lag_monitor import monitor as lag_monitor
+from utilities.startup import startup
+from utilities.asset_pack import get_image_pack
+from backgrounds import bg_layers_forest, BACKGROUND_LAYERS, FOREGROUND_LAYERS
 
 music = MusicLibrary()
 
 class GameManager:
     """Central hub for the game UI and states."""
-    def __init__(self, page: ft.Page):
+    def __init__(self, page: ft.Page, *, debug: bool = False):
         # State Variables (References)
         self.page: ft.Page = page
+        self.debug = debug
         self.player: Player = None
         self.audio_manager: AudioManager = None
+        self.music_streamer: MusicStreamer = None
+        self.spatial_audio: SpatialAudio = None
         self.background_stack: ft.Stack = None
         self.foreground_stack: ft.Stack = None
         self.stage: ft.Stack = None
         self.entity_list: list[Entity] = []
+        self.event_bus: EventBus = EventBus()
+        self.hud_manager: HUDManager = HUDManager()
+        self.spawn_director: SpawnDirector = SpawnDirector(self._spawn_enemy, self.entity_list)
+        self.governor = default_governor
+        self.ai_scheduler: AIScheduler = default_scheduler
+        self.attack_tokens: AttackTokenManager = default_tokens
+        self.input_manager: InputManager = input_manager
         
         # Task Management
         self.running_tasks: list[asyncio.Task] = []
         
         # World Configuration
         self.ground_level: int = 20
-        # To be implemented
-        # self.kill_count: int = 0
-        # self.deaths: int = 0
+        self.kill_count: int = 0
+        self.deaths: int = 0
     
     async def __call__(self):
         """An alternative way to get the main entry point."""
@@ -41,35 +62,78 @@ class GameManager:
     async def initialize(self):
         """The entry point called by Flet."""
         # --- Setup ---
+        # ? Fails loudly if there are no images to display (i.e.: a packaged build without its pack)
+        with startup.phase("image_pack"): get_image_pack()
+        # ? Loaded once here, the listener's thread and the player's key bindings both use it
+        with startup.phase("keyboard_import"): load_pynput()
+        # ? The mixer, SFX and keyboard listener are loaded in the background while the UI is built
         self.audio_manager = AudioManager(debug=False)
-        self.audio_manager.initialize()
-        self.audio_manager.play_music(music.ambience.forest)
-        km_start()
+        self.music_streamer = MusicStreamer(self.audio_manager)
+        self.spatial_audio = SpatialAudio(self.audio_manager, self.page)
+        audio_task = asyncio.create_task(self._init_audio())
+        keyboard_task = asyncio.create_task(self._init_keyboard())
         await self._setup_ui()
         
         # --- Event Handlers ---
         self.page.on_keyboard_event = self._on_keyboard_event
+        self.event_bus.subscribe(Panned, self._on_panned)
+        self.event_bus.subscribe(EntityDied, self._on_entity_died)
+        self.event_bus.subscribe(Spawned, self._update_music_mood)
+        self.hud_manager.attach(self.event_bus)
+        self.governor.on_change(self._on_tier_change)
+        lag_monitor.on_sample(self.governor.sample)
         
         # --- Start Loops ---
+        await asyncio.gather(audio_task, keyboard_task)
         self.start_tasks()
+        startup.mark("ready")
+        if self.debug: print(startup.summary())
+    
+    async def _init_audio(self):
+        """Initializes the mixer and starts the music, then preloads the SFX."""
+        with startup.phase("mixer_init"): await asyncio.to_thread(self.audio_manager.initialize)
+        self.music_streamer.start({Mood.AMBIENCE: music.ambience.forest, Mood.COMBAT: music.other.bossa_brasil})
+        with startup.phase("sfx_preload"): await asyncio.to_thread(self.audio_manager.preload_sfx, list(all_sfx()))
+    
+    async def _init_keyboard(self):
+        # ? Bound keys (jump, attack) are run on this loop, as soon as they're pressed
+        loop = asyncio.get_running_loop()
+        with startup.phase("keyboard"): await asyncio.to_thread(self.input_manager.start, loop)
     
     def _safe_update(self, ctrl: ft.Control):
         try: ctrl.update()
         except RuntimeError: pass
     
     async def _setup_ui(self):
-        """Initializes Player, Stacks, and HUD."""
-        # Stacks (BG/FG)
-        self.background_stack = ft.Stack(expand=True)
-        self.foreground_stack = ft.Stack(expand=True)
-        self.entity_stack = ft.Stack(expand=True)
-        
-        def bg_forest(index: int): return bg_image_forest(index, self.page)
+        """
+        Initializes Player, Stacks, and HUD.
+        The stage is shown as soon as its layers are ready, and the rest is added to it after.
+        """
+        center_task = asyncio.create_task(self.page.window.center())
         
-        for i in range(1, 7): self.background_stack.controls.append(bg_forest(i))
-        self.background_stack.controls.append(bg_forest(9))
-        self.foreground_stack.controls.extend([bg_forest(8), bg_forest(10)])
+        # Stacks (BG/FG)
+        with startup.phase("stage"):
+            self.background_stack = ft.Stack(expand=True)
+            self.foreground_stack = ft.Stack(expand=True)
+            self.entity_stack = ft.Stack(expand=True)
+            
+            self.background_stack.controls.extend(bg_layers_forest(BACKGROUND_LAYERS, self.page))
+            self.foreground_stack.controls.extend(bg_layers_forest(FOREGROUND_LAYERS, self.page))
+            self.stage = ft.Stack(
+                controls=[
+                    self.background_stack,
+                    self.entity_stack,
+                    self.foreground_stack,
+                ], expand=True
+            )
+            self.page.add(self.stage)
+        startup.mark("first_frame")
         
+        with startup.phase("ui"): self._setup_hud()
+        await center_task
+    
+    def _setup_hud(self):
+        """Adds the buttons and the Player to the stage."""
         # Buttons / HUD
         death_btn = ft.Button("KYS", ft.Icons.PERSON_OFF, on_click=self._player_die)
         damage_btn = ft.Button("Take Damage", ft.Icons.PERSONAL_INJURY, on_click=self._player_damage)
@@ -96,50 +160,73 @@ class GameManager:
         )
         
         # Composition
-        self.stage = ft.Stack(
-            controls=[
-                self.background_stack,
-                self.entity_stack,
-                self.foreground_stack,
-                buttons_row
-            ], expand=True
-        )
+        self.stage.controls.append(buttons_row)
         
         # Player
         self.player = NewPlayer(self)
-        
-        await self.page.window.center()
-        self.page.add(self.stage)
+        self.spatial_audio.set_listener(
+            lambda: self.player.stack.left + self.player.sprite.base_width / 2, emitter=self.player
+        )
+        self._safe_update(self.stage)
         
     # * === Event Handlers ===
     def _da_btn_on_change(self, e: ft.ControlEvent): self.audio_manager.directional_sfx = e.data
-    def _sb_btn_on_change(self, e: ft.ControlEvent):
+    def _sb_btn_on_change(self, e: ft.ControlEvent): self._show_borders(self.borders_shown)
+    
+    @property
+    def borders_shown(self) -> bool:
+        """Whether the bounding boxes are shown, they're disabled on lower quality tiers."""
+        return bool(self.show_border_sw.value) and self.governor.tier.debug_borders
+    
+    def _show_borders(self, show: bool):
         for entity in self.entity_list:
-            entity.toggle_show_border(e.data)
-            entity._atk_hb_show = e.data
+            entity.toggle_show_border(show)
+            entity._atk_hb_show = show
+    
+    def _on_tier_change(self, tier: QualityTier):
+        if self.debug: print(f"Quality tier: {tier.name} | {self.governor.telemetry()}")
+        if self.show_border_sw.disabled != (not tier.debug_borders):
+            self.show_border_sw.disabled = not tier.debug_borders
+            self._safe_update(self.show_border_sw)
+            self._show_borders(self.borders_shown)
     
     async def _player_die(self, _): await self.player.death()
     async def _player_revive(self, _): await self.player.revive()
     async def _player_damage(self, _): await self.player.take_damage(5)
     
+    def _on_panned(self, _: Panned): self.spawn_director.request_wave(EnemyType.GOBLIN)
+    def _on_entity_died(self, e: EntityDied):
+        if e.entity is self.player:
+            self.deaths += 1
+            self.attack_tokens.clear_target(e.entity)
+        else: self.kill_count += 1
+        self._update_music_mood()
+    
+    def _update_music_mood(self, _=None):
+        """Combat music while enemies are alive, back to the ambience a moment after the last one died."""
+        if self.spawn_director.alive_count(): self.music_streamer.set_mood(Mood.COMBAT)
+        else: self.music_streamer.set_mood(Mood.AMBIENCE, delay=4)
+    
     async def _on_keyboard_event(self, e: ft.KeyboardEvent):
+        # ? Gameplay keys are read through the `InputManager`
         match e.key:
-            case " ": self.player.jump()
-            case "V": self.player.attack()
             case "Escape": await self.page.window.close()
     
     # * === EVENTS ===
     def summon_gobby(self, spawn_amount: int = None, center_spawn: bool = False):
-        """Summons a random gobby."""
-        def rnd_name():
-            names = ["Gobby", "Gibby", "Geeb", "Goob", "Gubby", "Gebby", "Gub", "Gerald", "Gibby", "Gib",
-                     "Gob", "Gobber", "Gob Lin", "Gob Gob", "Geb Geb", "Gub Gub", "Gib Gib", "Gibba", "Gibber"]
-            return random.choice(names)
-        
-        if spawn_amount is None: spawn_amount = random.randint(1, 5)
-        elif spawn_amount == 0: return
-        else: spawn_amount = abs(spawn_amount)
-        for _ in range(spawn_amount): NewGoblin(game_manager=self, name=rnd_name(), center_spawn=center_spawn)
+        """
+        Summons random gobbies through the spawn director, or a wave of them if `spawn_amount`
+        isn't provided. Gobbies over the enemy cap aren't summoned.
+        """
+        if spawn_amount is None: self.spawn_director.request_wave(EnemyType.GOBLIN, center_spawn=center_spawn)
+        elif spawn_amount != 0: self.spawn_director.request(EnemyType.GOBLIN, spawn_amount, center_spawn=center_spawn)
+    
+    def _spawn_enemy(self, type: EnemyType, center_spawn: bool) -> Entity:
+        """Builds an enemy of `type` into the scene, used by the spawn director."""
+        data = type.value
+        name = random.choice(data.names) if data.names else data.name
+        match type:
+            case EnemyType.GOBLIN: return NewGoblin(game_manager=self, name=name, center_spawn=center_spawn)
     
     # * === TASK MANAGEMENT ===
     def start_tasks(self):
@@ -153,7 +240,7 @@ class GameManager:
                 self.player,
                 self.entity_list,
                 self.stage,
-                self.summon_gobby
+                event_bus=self.event_bus
             )
             
         # Store tasks so we can cancel them later
@@ -163,6 +250,17 @@ class GameManager:
     def cleanup(self):
         """Call this when exiting or changing levels."""
         for task in self.running_tasks: attempt_cancel(task)
+        self.spawn_director.clear()
+        self.ai_scheduler.clear()
+        self.attack_tokens.clear()
+        self.input_manager.stop()
+        if self.player is not None: self.player.unbind_keys()
+        if self.debug:
+            print(f"Input latency: {self.input_manager.latency_summary()}")
+            if self.player is not None: print(f"Input buffer: {self.player.input_buffer.summary()}")
+        if self.music_streamer is not None: self.music_streamer.stop()
+        if self.spatial_audio is not None: self.spatial_audio.clear()
+        if self.audio_manager is not None and self.audio_manager.arbiter is not None: self.audio_manager.arbiter.clear()
 
 class GameManagerMixin:
     """Mixin to bridge GameManager data into Entities."""
@@ -178,6 +276,9 @@ class GameManagerMixin:
             "page": game_manager.page,
             "audio_manager": game_manager.audio_manager,
             "entity_list": game_manager.entity_list,
+            "event_bus": game_manager.event_bus,
+            "hud_manager": game_manager.hud_manager,
+            "spatial_audio": game_manager.spatial_audio,
             "debug": debug
         }
         
@@ -194,8 +295,8 @@ class GameManagerMixin:
             return
         
         # Apply visual settings that required the stack to exist
-        self.toggle_show_border(game_manager.show_border_sw.value)
-        self._atk_hb_show = game_manager.show_border_sw.value
+        self.toggle_show_border(game_manager.borders_shown)
+        self._atk_hb_show = game_manager.borders_shown
         
         # Add to Logic List (if not already there)
         if self not in game_manager.entity_list: game_manager.entity_list.append(self)
@@ -203,6 +304,9 @@ class GameManagerMixin:
         # Add to Visual Stack
         # ? This calls self.__call__(**kwargs), getting the control and starting loops
         game_manager.entity_stack.controls.append(self.__call__(**call_kwargs))
+        # ? Spawns can happen outside of a stage update (i.e.: from the `SpawnDirector`'s pump)
+        game_manager._safe_update(game_manager.entity_stack)
+        game_manager.event_bus.publish(Spawned(self))
         
 class NewGoblin(Enemy, GameManagerMixin):
     """Wrapped `Enemy` class to be used in the `GameMaker` class."""
@@ -226,7 +330,7 @@ class NewPlayer(Player, GameManagerMixin):
     ):
         self._configure_from_manager(game_manager)
         super().__init__(
-            held_keys=held_keys,
+            input_manager=game_manager.input_manager,
             **self._get_base_kwargs(game_manager, debug)
         )
         self._spawn_into_scene(game_manager)
\ No newline at end of file
@@ -0,0 +1,157 @@
+import asyncio, hashlib, re
+import flet as ft
+from functools import cache
+from typing import TYPE_CHECKING
+
+from utilities.asset_pack import image_exists, resolve_image_src
+from utilities.event_bus import EventBus, Panned, Spawned
+
+if TYPE_CHECKING:
+    from entities.entity import Entity
+
+HEALTH_BAR_WIDTH = 120 # px, see `Entity._make_health_bar()`
+NAMETAG_DIR = "images/nametags"
+NAMETAG_SIZE = 20
+NAMETAG_OUTLINE = 2 # px
+
+
+# * === NAMETAGS ===
+def get_nametag_src(name: str) -> str:
+    """Returns the `src` of the pre-rendered nametag of `name` (see `tools/render_nametags.py`)."""
+    slug = re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+    digest = hashlib.sha1(name.encode()).hexdigest()[:6]
+    return f"{NAMETAG_DIR}/{slug}_{digest}.png"
+
+@cache
+def _prerendered_nametag(name: str) -> str | None:
+    """Checks (once per name) if a pre-rendered nametag exists, and returns its `src`."""
+    src = get_nametag_src(name)
+    return src if image_exists(src) else None
+
+@cache
+def _nametag_style() -> ft.TextStyle:
+    """The outline of the nametags, drawn as 4 diagonal hard shadows instead of a second stroked `Text`."""
+    return ft.TextStyle(shadow=[
+        ft.BoxShadow(color=ft.Colors.BLACK, offset=ft.Offset(x * NAMETAG_OUTLINE, y * NAMETAG_OUTLINE))
+        for x in (-1, 1) for y in (-1, 1)
+    ])
+
+def make_nametag(name: str) -> ft.Control:
+    """
+    Returns the nametag of `name`. The pre-rendered bitmap is used if it exists,
+    otherwise a single `Text` with the shared outline style.
+    """
+    src = _prerendered_nametag(name)
+    if src is not None: return ft.Image(src=resolve_image_src(src), filter_quality=ft.FilterQuality.NONE, gapless_playback=True)
+    return ft.Text(value=name, size=NAMETAG_SIZE, color=ft.Colors.WHITE, style=_nametag_style())
+
+# * === HUD MANAGER ===
+class HUDManager:
+    """
+    Batches the HUD (nametag and health bar) updates of every entity.\n
+    Health changes are collected and pushed once per frame, and only when the visible width
+    of the bar has changed. HUDs of off-screen enemies are hidden and frozen until they are back
+    on screen, and so are the health bars of enemies at full health (only if `hide_full_health`,
+    off by default).
+    """
+    def __init__(
+        self, *, frame_time: float = 1 / 30, sweep_interval: float = 0.5,
+        hide_full_health: bool = False
+    ):
+        self.frame_time = frame_time
+        self.sweep_interval = sweep_interval
+        self.hide_full_health = hide_full_health
+        # ? Entity -> Whether its HUD is hidden when off-screen
+        self._entities: dict["Entity", bool] = {}
+        self._pushed_widths: dict["Entity", int] = {}
+        self._dirty: set["Entity"] = set()
+        self._flush_handle: asyncio.TimerHandle = None
+        self._sweep_handle: asyncio.TimerHandle = None
+
+    def attach(self, event_bus: EventBus):
+        """Refreshes the HUDs' visibility when the stage pans, or when an entity spawns."""
+        event_bus.subscribe(Panned, lambda _: self.sweep())
+        event_bus.subscribe(Spawned, lambda e: self._push(e.entity) if e.entity in self._entities else None)
+
+    def register(self, entity: "Entity", *, cullable: bool = False):
+        """Starts managing the HUD of `entity`. Set `cullable` to hide it while off-screen."""
+        self._entities[entity] = cullable
+        self._push(entity, update=False)
+        self._schedule_sweep()
+
+    def unregister(self, entity: "Entity"):
+        self._entities.pop(entity, None)
+        self._pushed_widths.pop(entity, None)
+        self._dirty.discard(entity)
+
+    def mark_dirty(self, entity: "Entity"):
+        """Queues the HUD of `entity` to be refreshed on the next frame."""
+        if entity not in self._entities: return
+        self._dirty.add(entity)
+        if self._flush_handle is not None: return
+        try: self._flush_handle = asyncio.get_running_loop().call_later(self.frame_time, self.flush)
+        except RuntimeError: self.flush() # ? No running loop, refresh right away
+
+    def flush(self):
+        """Pushes the queued HUD changes."""
+        self._flush_handle = None
+        dirty, self._dirty = self._dirty, set()
+        for entity in dirty:
+            if entity in self._entities: self._push(entity)
+
+    def sweep(self):
+        """Hides or shows the HUDs of entities that went off-screen, or came back on screen."""
+        for entity in self._entities: self._push(entity)
+
+    # * === INTERNALS ===
+    def _schedule_sweep(self):
+        if self._sweep_handle is not None or not self.sweep_interval: return
+        try: self._sweep_handle = asyncio.get_running_loop().call_later(self.sweep_interval, self._periodic_sweep)
+        except RuntimeError: pass
+
+    def _periodic_sweep(self):
+        self._sweep_handle = None
+        if not self._entities: return
+        self.sweep()
+        self._schedule_sweep()
+
+    def _bar_width(self, entity: "Entity") -> int:
+        """Returns the visible width (in px) of the remaining health of `entity`."""
+        ratio = entity.stats.health / entity.stats.max_health if entity.stats.max_health else 0
+        return round(HEALTH_BAR_WIDTH * min(max(ratio, 0), 1))
+
+    def _is_on_screen(self, entity: "Entity") -> bool:
+        left, width = entity.stack.left or 0, entity.stack.width or 0
+        return left + width > 0 and left < entity.page.width
+
+    def _push(self, entity: "Entity", *, update: bool = True):
+        """Applies the current health and visibility to the HUD of `entity`, if anything changed."""
+        hud: ft.Control = entity._hud
+        if hud is None: return
+        cullable = self._entities[entity]
+        changed: list[ft.Control] = []
+
+        visible = not cullable or self._is_on_screen(entity)
+        if hud.visible != visible:
+            hud.visible = visible
+            changed.append(hud)
+        if not visible: # ? Frozen, the health is applied once it's shown again
+            if update: entity._safe_update(*changed)
+            return
+
+        width = self._bar_width(entity)
+        if self._pushed_widths.get(entity) != width:
+            self._pushed_widths[entity] = width
+            entity.health_bar.value = 1 - (width / HEALTH_BAR_WIDTH)
+            changed.append(entity.health_bar)
+
+        bar_visible = not (cullable and self.hide_full_health and width == HEALTH_BAR_WIDTH)
+        if entity._health_bar_c.visible != bar_visible:
+            entity._health_bar_c.visible = bar_visible
+            changed.append(entity._health_bar_c)
+
+        # ? Updating the HUD itself also sends its children
+        if update and changed: entity._safe_update(*([hud] if hud in changed else changed))
+
+# ? Used by entities that are not given a HUD manager of their own
+default_hud = HUDManager()
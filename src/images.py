@@ -1,23 +1,76 @@
 import flet as ft
+from functools import cache
+from pathlib import Path
 from typing import Literal
 
+from utilities.asset_pack import get_image_pack, resolve_image_src
+from utilities.file_management import get_variant_src, resolver
+
+
+@cache
+def has_prescaled_variants(src_dir: str, scale: int) -> bool:
+    """Checks (once per directory) if the pre-scaled variants of a sprite directory exist."""
+    variant_dir = Path(get_variant_src(f"{src_dir}/_", scale)).parent.as_posix()
+    pack = get_image_pack()
+    if pack is not None and pack.has_dir(variant_dir): return True
+    return resolver.has_dir(f"assets/{variant_dir}")
 
 class Sprite(ft.Image):
-    """All sprites will have twice their scale for better visuals."""
+    """
+    All sprites will have twice their scale for better visuals.\n
+    If `prescaled` is `True` (or `None` and the variants exist), the pre-scaled and mirrored
+    variants from `tools/prescale_assets.py` are displayed natively instead, in a box that covers
+    the same area as the scaled sprite. Flipping then swaps to the mirrored frames rather than
+    using a negative scale.\n
+    `base_width` and `base_height` are the requested (unscaled) size, which entities are laid out with.
+    """
     def __init__(
         self, src: str, width: ft.Number, height: ft.Number, *,
         filter_quality: ft.FilterQuality = ft.FilterQuality.NONE,
         fit: ft.BoxFit = ft.BoxFit.COVER, gapless_playback: bool = True,
         scale: ft.Scale = ft.Scale(scale_x=2, scale_y=2),
-        offset: ft.Offset = ft.Offset(0, 0.145), debug: bool = False
+        offset: ft.Offset = ft.Offset(0, 0.145), prescaled: bool = None,
+        debug: bool = False
     ):
+        factor = int(abs(scale.scale_x)) if isinstance(scale, ft.Scale) else 1
+        if prescaled is None:
+            prescaled = factor > 1 and factor == abs(scale.scale_y) \
+                and has_prescaled_variants(Path(src).parent.as_posix(), factor)
+        base_src = src
+        base_width, base_height = width, height
+        if prescaled:
+            # ? Grow the box around its center instead of scaling it, the offset is relative to the box
+            src = get_variant_src(src, factor)
+            scale = None
+            width *= factor
+            height *= factor
+            shift = (factor - 1) / (2 * factor)
+            offset_x, offset_y = (offset.x, offset.y) if offset is not None else (0, 0)
+            offset = ft.Offset(offset_x / factor - shift, offset_y / factor - shift)
         super().__init__(
-            src=src, width=width, height=height, filter_quality=filter_quality,
+            src=resolve_image_src(src), width=width, height=height, filter_quality=filter_quality,
             fit=fit, gapless_playback=gapless_playback, scale=scale, offset=offset
         )
+        self.prescaled = prescaled
+        self.prescale: int = factor if prescaled else 1
+        self._base_src: str = base_src
+        self.base_width: ft.Number = base_width
+        self.base_height: ft.Number = base_height
+        self._facing: Literal[-1, 1] = 1
         self.debug = debug
         self._handler_str = "Sprite"
     
+    @property
+    def base_src(self) -> str:
+        """The `src` as it was requested, before resolving any pre-scaled variant."""
+        return self._base_src
+    
+    @property
+    def facing(self) -> Literal[-1, 1]:
+        """The facing direction of the sprite; `1` for right, `-1` for left."""
+        if self.prescaled: return self._facing
+        return 1 if self.scale.scale_x > 0 else -1
+    
     def _debug_msg(self, msg: str, *, end: str = None, include_handler: bool = True):
         """A simple debug message for simple logging."""
         if self.debug:
@@ -30,20 +83,26 @@ class Sprite(ft.Image):
     
     def change_src(self, new_src: str, update_ctrl: bool = True):
         """Swap the `src` and optionally update."""
-        self.src = new_src
+        self._base_src = new_src
+        if self.prescaled:
+            new_src = get_variant_src(new_src, self.prescale, mirrored=self._facing < 0)
+        self.src = resolve_image_src(new_src)
         if update_ctrl: self.try_update()
     
     def flip_x(self, direction: Literal[-1, 1] = None, update_ctrl: bool = True):
         """Flip the image on the x-axis."""
         if direction is None:
             self._debug_msg(f"No provided direction, using self as reference: ", end="")
-            direction = -1 if self.scale.scale_x > 0 else 1
+            direction = -self.facing
             self._debug_msg(direction, include_handler=False)
+        if self.prescaled:
+            self._facing = direction
+            self.change_src(self._base_src, update_ctrl)
+            return
         new_scale = abs(self.scale.scale_x) * direction
         self.scale = ft.Scale(scale_x=new_scale, scale_y=self.scale.scale_y)
         if update_ctrl: self.try_update()
             
-            
 # * Test for the Sprite class; a simple implementation
 # ? You can run this directly with file paths such as:
 # ? uv run py .\src\images.py
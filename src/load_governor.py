@@ -0,0 +1,105 @@
+from dataclasses import dataclass
+from typing import Callable
+
+
+@dataclass(frozen=True, slots=True)
+class QualityTier:
+    """
+    How much fidelity is traded for headroom.\n
+    `footstep_stride`: Every Nth footstep SFX is played, `0` mutes them.\n
+    `distant_anim_stride`: Distant enemies play every Nth animation frame (for N times as long).\n
+    `debug_borders`: Whether the bounding boxes can be shown.\n
+    `ai_tick_scale`: Multiplier of the enemies' movement loop interval.
+    """
+    name: str
+    footstep_stride: int = 1
+    distant_anim_stride: int = 1
+    debug_borders: bool = True
+    ai_tick_scale: int = 1
+
+TIERS: tuple[QualityTier, ...] = (
+    QualityTier("HIGH"),
+    QualityTier("MEDIUM", footstep_stride=2, distant_anim_stride=2),
+    QualityTier("LOW", footstep_stride=4, distant_anim_stride=2, debug_borders=False, ai_tick_scale=2),
+    QualityTier("MINIMAL", footstep_stride=0, distant_anim_stride=3, debug_borders=False, ai_tick_scale=3),
+)
+
+@dataclass(frozen=True, slots=True)
+class GovernorTelemetry:
+    tier: str
+    lag_ms: float       # Smoothed event loop lag
+    peak_lag_ms: float
+    samples: int
+    overruns: int       # Samples over the degrade threshold
+    tier_changes: int
+
+class LoadGovernor:
+    """
+    Steps through the quality `TIERS` based on the event loop lag.\n
+    Lag samples are fed with `sample()` (i.e.: by the lag monitor). The tier is
+    lowered after `degrade_samples` consecutive samples over `degrade_lag` seconds, and only
+    raised back after `recover_samples` consecutive samples under `recover_lag` seconds.
+    """
+    def __init__(
+        self, *, degrade_lag: float = 0.03, recover_lag: float = 0.01,
+        degrade_samples: int = 3, recover_samples: int = 20,
+        smoothing: float = 0.3, debug: bool = False
+    ):
+        self.degrade_lag = degrade_lag
+        self.recover_lag = recover_lag
+        self.degrade_samples = degrade_samples
+        self.recover_samples = recover_samples
+        self.smoothing = smoothing
+        self.debug = debug
+        self.tier_index: int = 0
+        self._listeners: list[Callable[[QualityTier], None]] = []
+        self._lag: float = 0.0
+        self._peak_lag: float = 0.0
+        self._samples: int = 0
+        self._overruns: int = 0
+        self._tier_changes: int = 0
+        self._streak: int = 0 # ? Positive when over `degrade_lag`, negative when under `recover_lag`
+
+    @property
+    def tier(self) -> QualityTier:
+        return TIERS[self.tier_index]
+
+    def on_change(self, listener: Callable[[QualityTier], None]):
+        """Calls `listener(tier)` whenever the tier changes."""
+        self._listeners.append(listener)
+
+    def telemetry(self) -> GovernorTelemetry:
+        return GovernorTelemetry(
+            tier=self.tier.name, lag_ms=round(self._lag * 1000, 2),
+            peak_lag_ms=round(self._peak_lag * 1000, 2), samples=self._samples,
+            overruns=self._overruns, tier_changes=self._tier_changes
+        )
+
+    # * === SAMPLING ===
+    def sample(self, lag: float):
+        """Feeds an event loop lag sample (in seconds), and changes the tier if needed."""
+        self._samples += 1
+        self._lag += (lag - self._lag) * self.smoothing
+        self._peak_lag = max(self._peak_lag, lag)
+        if self._lag > self.degrade_lag:
+            self._overruns += 1
+            self._streak = max(self._streak, 0) + 1
+            if self._streak >= self.degrade_samples: self._set_tier(self.tier_index + 1)
+        elif self._lag < self.recover_lag:
+            self._streak = min(self._streak, 0) - 1
+            if -self._streak >= self.recover_samples: self._set_tier(self.tier_index - 1)
+        else: self._streak = 0
+
+    def _set_tier(self, index: int):
+        self._streak = 0
+        index = min(max(index, 0), len(TIERS) - 1)
+        if index == self.tier_index: return
+        self.tier_index = index
+        self._tier_changes += 1
+        if self.debug: print(f"[LoadGovernor] Quality tier: {self.tier.name} ({self.telemetry()})")
+        for listener in self._listeners:
+            try: listener(self.tier)
+            except Exception as e: print(f"[LoadGovernor] Error in tier listener: {e}")
+
+# ? Shared by the entities, fed by the lag monitor (see `GameManager`)
+default_governor = LoadGovernor()
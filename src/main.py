@@ -1,19 +1,35 @@
-import asyncio
-import flet as ft
+from utilities.startup import startup # ? Imported first, it's the origin of the startup report
 
-from setup import before_main_ui
-from game_manager import GameManager
-from utilities.events import silence_event_loop_closed
+with startup.phase("imports"):
+    import asyncio, os
+    import flet as ft
+    
+    from setup import before_main_ui
+    from game_manager import GameManager
+    from utilities.events import silence_event_loop_closed
+    from utilities.lag_monitor import monitor as lag_monitor
 
 # * As of version >= 0.1.2, running the project in dev mode requires the following command:
 # * uv pip install -e .
 # ? It will fix the import complications
 
 async def main(page: ft.Page):
+    startup.mark("main")
     # Attach the typed handler to the running loop
     loop = asyncio.get_running_loop()
     loop.set_exception_handler(silence_event_loop_closed)
-    game = GameManager(page)
+    # ? i.e.: `LAG_SUMMARY=5` prints a lag summary every 5s, `SLOW_CALLBACK=0.05` reports callbacks over 50ms
+    lag_monitor.summary_interval = float(os.environ.get("LAG_SUMMARY", 0)) or None
+    lag_monitor.slow_callback_duration = float(os.environ.get("SLOW_CALLBACK", 0)) or None
+    lag_monitor.install(loop)
+    # ? i.e.: `GAME_DEBUG=1` prints the startup report, and the input stats on cleanup
+    game = GameManager(page, debug=bool(os.environ.get("GAME_DEBUG")))
     await game()
     
+    # ? Set by `tools/bench_cold_start.py`, to measure the startup from a clean process
+    if report_path := os.environ.get("STARTUP_REPORT"): startup.dump(report_path)
+    if os.environ.get("STARTUP_EXIT"):
+        game.cleanup()
+        await page.window.close()
+    
 if __name__ == "__main__": ft.run(main=main, before_main=before_main_ui)
\ No newline at end of file
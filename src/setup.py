@@ -27,15 +27,17 @@ def before_main_ui(page: ft.Page):
     page.theme = ft.Theme(font_family=FontStyles.INTER, color_scheme_seed="#7693b3")
     # page.window.title_bar_hidden = True
     
-async def fix_stretched_window(page: ft.Page, *, center_page: bool = False):
+async def fix_stretched_window(page: ft.Page, *, center_page: bool = False, delay: float = 0.1):
     """
     When launching a Flet desktop app, sometimes the window appears to be stretched.
     The fix? Just resize it. So, that's exactly what this does.
+
+    `delay` is how long the window stays resized, a frame or two is enough.
     """
     page.window.width = WINDOW_WIDTH * 1.1
     page.window.height = WINDOW_HEIGHT * 1.1
     page.window.update()
-    await asyncio.sleep(1)
+    await asyncio.sleep(delay)
     page.window.width = WINDOW_WIDTH
     page.window.height = WINDOW_HEIGHT
     page.window.update()
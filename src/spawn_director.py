@@ -0,0 +1,109 @@
+import asyncio, random, time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable
+
+from entities.entity import Entity, Factions
+from entities.enemy import EnemyType
+
+
+@dataclass(frozen=True, slots=True)
+class SpawnRequest:
+    type: EnemyType
+    center_spawn: bool = False
+
+class SpawnDirector:
+    """
+    Queues enemy spawns, and spreads their construction across frames.\n
+    `spawn(type, center_spawn)` builds and adds an enemy to the scene. At most `frame_budget`
+    seconds are spent spawning per frame, and spawning backs off while the event loop lags
+    behind by more than `lag_threshold` seconds. Requests over `max_enemies` (or over the
+    `WaveData.max_alive` of their type) are dropped.
+    """
+    def __init__(
+        self, spawn: Callable[[EnemyType, bool], Entity], entity_list: list[Entity], *,
+        max_enemies: int = 12, frame_time: float = 1 / 30, frame_budget: float = 1 / 120,
+        lag_threshold: float = 0.05, max_backoff: float = 1.0, debug: bool = False
+    ):
+        self._spawn = spawn
+        self._entity_list = entity_list
+        self.max_enemies = max_enemies
+        self.frame_time = frame_time
+        self.frame_budget = frame_budget
+        self.lag_threshold = lag_threshold
+        self.max_backoff = max_backoff
+        self.debug = debug
+        self._queue: deque[SpawnRequest] = deque()
+        self._handle: asyncio.TimerHandle = None
+        self._delay: float = frame_time
+        self._expected_at: float = 0.0
+
+    def _debug_msg(self, msg: str):
+        if self.debug: print(f"[SpawnDirector] {msg}")
+
+    # * === REQUESTS ===
+    def alive_count(self, type: EnemyType = None) -> int:
+        """Returns the amount of alive enemies (of `type`, if provided)."""
+        return sum(
+            1 for e in self._entity_list
+            if e.faction != Factions.HUMAN and not e.states.dead
+            and (type is None or getattr(e, "type", None) is type)
+        )
+
+    def queued_count(self, type: EnemyType = None) -> int:
+        return sum(1 for r in self._queue if type is None or r.type is type)
+
+    def request(self, type: EnemyType, amount: int = 1, *, center_spawn: bool = False) -> int:
+        """Queues `amount` spawns of `type`. Returns the amount that was queued."""
+        room = min(
+            self.max_enemies - self.alive_count() - self.queued_count(),
+            type.value.wave.max_alive - self.alive_count(type) - self.queued_count(type)
+        )
+        queued = max(0, min(abs(amount), room))
+        self._queue.extend(SpawnRequest(type, center_spawn) for _ in range(queued))
+        if queued < abs(amount): self._debug_msg(f"Dropped {abs(amount) - queued} {type.name} spawn(s), at the cap")
+        if queued: self._schedule(self.frame_time)
+        return queued
+
+    def request_wave(self, type: EnemyType, *, center_spawn: bool = False) -> int:
+        """Queues a wave of `type`, sized by its `WaveData`."""
+        wave = type.value.wave
+        return self.request(type, random.randint(wave.min_size, wave.max_size), center_spawn=center_spawn)
+
+    def clear(self):
+        """Drops the queued spawns."""
+        self._queue.clear()
+        if self._handle is not None: self._handle.cancel()
+        self._handle = None
+
+    # * === FRAME PUMP ===
+    def _schedule(self, delay: float):
+        if self._handle is not None: return
+        try: loop = asyncio.get_running_loop()
+        except RuntimeError: # ? No running loop, spawn everything right away
+            while self._queue: self._spawn_next()
+            return
+        self._expected_at = loop.time() + delay
+        self._handle = loop.call_later(delay, self._pump)
+
+    def _pump(self):
+        """Spawns the queued enemies that fit in this frame's budget."""
+        self._handle = None
+        lag = asyncio.get_running_loop().time() - self._expected_at
+        if lag > self.lag_threshold:
+            # ? The loop is overloaded, wait longer before adding anything to it
+            self._delay = min(self._delay * 2, self.max_backoff)
+            self._debug_msg(f"Backing off for {self._delay:.3f}s (lag: {lag * 1000:.1f}ms)")
+        else:
+            self._delay = max(self._delay / 2, self.frame_time)
+            start = time.perf_counter()
+            while self._queue:
+                self._spawn_next()
+                if time.perf_counter() - start >= self.frame_budget: break
+        if self._queue: self._schedule(self._delay)
+
+    def _spawn_next(self):
+        request = self._queue.popleft()
+        if self.alive_count() >= self.max_enemies: return
+        try: self._spawn(request.type, request.center_spawn)
+        except Exception as e: print(f"[SpawnDirector] Error spawning {request.type.name}: {e}")
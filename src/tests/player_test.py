@@ -1,6 +1,6 @@
 import flet as ft
 
-from utilities.keyboard_manager import start as km_start, held_keys
+from utilities.keyboard_manager import start as km_start, input_manager
 from audio.audio_manager import AudioManager
 from entities.player import Player
 
@@ -19,17 +19,15 @@ def test(page: ft.Page):
     
     async def player_dmg(_): await player.take_damage(5)
     
-    player = Player(page, audio_manager, held_keys, debug=True)
+    player = Player(page, audio_manager, input_manager, debug=True)
     player._atk_hb_show = True
     player.toggle_show_border(True)
     take_dmg_btn = ft.Button(content="Take Damage", on_click=player_dmg, left=60, top=20)
     stage = ft.Stack(controls=[player(), take_dmg_btn], expand=True)
     
     async def on_keyboard_event(e: ft.KeyboardEvent):
-        """Handles 'on-press' events for the player."""
+        """Jumping and attacking are bound by the player, through the `InputManager`."""
         match e.key:
-            case " ": player.jump()
-            case "V": player.attack()
             case "Escape": await page.window.close()
     
     page.add(stage)
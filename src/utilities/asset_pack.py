@@ -0,0 +1,148 @@
+import hashlib, json, mmap, struct
+from collections import OrderedDict
+from pathlib import Path
+
+from utilities.file_management import get_asset_path, resolver
+
+PACK_SRC = "assets/images.pack"
+MAGIC = b"FPAP"
+VERSION = 1
+# ? Magic, version, index length
+HEADER = struct.Struct("<4sHI")
+
+
+class IntegrityError(ValueError):
+    """An asset in the pack doesn't match its hash."""
+
+class AssetPack:
+    """
+    A pack of image assets (see `tools/build_asset_pack.py`), memory-mapped once.\n
+    Assets are keyed by their `src` (i.e.: `images/player/idle_0.png`). The index is checked
+    against the mapped data when the pack is opened, and each asset is checked against its
+    SHA-256 the first time it's read. Assets are served straight from the mapped bytes (Flet
+    decodes them on the client), nothing is extracted to the disk. The last `max_cached` assets
+    read are kept in memory, ready to be displayed.
+    """
+    def __init__(self, path: str | Path, *, max_cached: int = 128):
+        self.path = Path(path)
+        self.max_cached = max_cached
+        self._file = open(self.path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, index_length = HEADER.unpack_from(self._map)
+            if magic != MAGIC or version != VERSION: raise ValueError(f"Unsupported asset pack: {self.path}")
+            self._data_start = HEADER.size + index_length
+            # ? src -> (offset, length, sha256)
+            self._index: dict[str, tuple[int, int, str]] = {
+                src: tuple(entry) for src, entry in json.loads(self._map[HEADER.size:self._data_start]).items()
+            }
+            self._check_index()
+        except (ValueError, struct.error):
+            self.close()
+            raise
+        self._dirs: set[str] = {Path(src).parent.as_posix() for src in self._index}
+        self._blobs: OrderedDict[str, bytes] = OrderedDict()
+        self._verified: set[str] = set()
+
+    def _check_index(self):
+        """Raises a `ValueError` if the index doesn't match the data (i.e.: a truncated or stale pack)."""
+        data_length = len(self._map) - self._data_start
+        end = max((offset + length for offset, length, _ in self._index.values()), default=0)
+        if end != data_length:
+            raise ValueError(f"The index of {self.path} doesn't match its data ({end} != {data_length} bytes)")
+
+    @classmethod
+    def open(cls, path: str | Path, **kwargs) -> "AssetPack | None":
+        """Returns the pack at `path`, or `None` if it doesn't exist or is invalid."""
+        try: return cls(path, **kwargs)
+        except (OSError, ValueError): return None
+
+    def __contains__(self, src: str) -> bool:
+        return src in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def has_dir(self, src_dir: str) -> bool:
+        """Returns `True` if the pack has assets directly in `src_dir`."""
+        return src_dir in self._dirs
+
+    def read(self, src: str) -> bytes:
+        """Returns the verified content of `src`. Raises a `KeyError` if it's not in the pack."""
+        blob = self._blobs.get(src)
+        if blob is not None:
+            self._blobs.move_to_end(src)
+            return blob
+        offset, length, digest = self._index[src]
+        start = self._data_start + offset
+        blob = self._map[start:start + length]
+        if src not in self._verified:
+            if hashlib.sha256(blob).hexdigest() != digest: raise IntegrityError(f"Corrupted asset in pack: {src}")
+            self._verified.add(src)
+        self._blobs[src] = blob
+        if len(self._blobs) > self.max_cached: self._blobs.popitem(last=False)
+        return blob
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+def write_pack(path: str | Path, assets: dict[str, bytes]) -> int:
+    """Writes `assets` (src -> content) as an asset pack. Returns the size of the pack."""
+    index: dict[str, tuple[int, int, str]] = {}
+    offset = 0
+    for src, blob in assets.items():
+        index[src] = (offset, len(blob), hashlib.sha256(blob).hexdigest())
+        offset += len(blob)
+    index_bytes = json.dumps(index, separators=(",", ":")).encode()
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(index_bytes)))
+        file.write(index_bytes)
+        for blob in assets.values(): file.write(blob)
+    return HEADER.size + len(index_bytes) + offset
+
+# * === IMAGE PACK ===
+_image_pack: AssetPack | None = None
+_image_pack_loaded: bool = False
+
+def _has_loose_images() -> bool:
+    return any(key.startswith("assets/images/") for key in resolver.table)
+
+def get_image_pack() -> AssetPack | None:
+    """
+    Returns the image pack, opened on first use. `None` if there's none, and the loose images
+    are used instead (i.e.: in dev). Raises a `RuntimeError` if the pack can't be opened and
+    there are no loose images to fall back on (i.e.: a packaged build, which only ships the pack).
+    """
+    global _image_pack, _image_pack_loaded
+    if not _image_pack_loaded:
+        _image_pack_loaded = True
+        try: _image_pack = AssetPack(get_asset_path(PACK_SRC))
+        except (OSError, ValueError) as e:
+            if _has_loose_images(): return None
+            raise RuntimeError(f"No images to display, the image pack is unusable: {e}") from e
+    return _image_pack
+
+def resolve_image_src(src: str) -> str | bytes:
+    """
+    Returns the `src` to display an image with. An overlay (i.e.: a mod) replacing the image
+    comes first, then the content of the image from the pack, then the loose file.
+    """
+    if override := resolver.override(f"assets/{src}"): return override
+    pack = get_image_pack()
+    if pack is None or src not in pack: return src
+    try: return pack.read(src)
+    except IntegrityError as e:
+        print(f"[AssetPack] Falling back to the loose file of {src}: {e}")
+        return src
+
+def image_exists(src: str) -> bool:
+    """Returns `True` if the image `src` is packed, or exists as a loose file (or in an overlay)."""
+    pack = get_image_pack()
+    return (pack is not None and src in pack) or resolver.exists(f"assets/{src}")
+
+def read_image_bytes(src: str) -> bytes:
+    """Returns the content of the image `src`, from the image pack if it's packed (and not overridden)."""
+    pack = get_image_pack()
+    if pack is not None and src in pack and not resolver.override(f"assets/{src}"): return pack.read(src)
+    return Path(get_asset_path(f"assets/{src}")).read_bytes()
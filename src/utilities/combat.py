@@ -0,0 +1,59 @@
+import itertools, time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from entities.entity import Entity
+
+_swing_ids = itertools.count(1)
+
+
+@dataclass(frozen=True, slots=True)
+class SwingRules:
+    """
+    How many times a single attack swing can land.\n
+    `hits_per_target`: Times the same target can be hit (multi-hit attacks).\n
+    `hit_interval`: Seconds between two hits on the same target.\n
+    `max_targets`: Targets that can be hit, `None` pierces through all of them.
+    """
+    hits_per_target: int = 1
+    hit_interval: float = 0.0
+    max_targets: int | None = None
+
+@dataclass(slots=True)
+class AttackSwing:
+    """
+    Registry of the targets an attack swing has already hit.
+    A new one is started for every attack, so each target is only resolved once per swing.
+    """
+    attacker: "Entity"
+    rules: SwingRules = SwingRules()
+    swing_id: int = field(default_factory=lambda: next(_swing_ids))
+    # ? id(target) -> (hit count, time of the last hit)
+    _hits: dict[int, tuple[int, float]] = field(default_factory=dict)
+
+    @property
+    def targets_hit(self) -> int:
+        return len(self._hits)
+
+    @property
+    def spent(self) -> bool:
+        """`True` if no new target can be hit by this swing."""
+        return self.rules.max_targets is not None and len(self._hits) >= self.rules.max_targets
+
+    def can_hit(self, target: Any, now: float = None) -> bool:
+        """Returns `True` if `target` can (still) be hit by this swing."""
+        hit = self._hits.get(id(target))
+        if hit is None: return not self.spent
+        count, last_hit = hit
+        if count >= self.rules.hits_per_target: return False
+        if now is None: now = time.monotonic()
+        return now - last_hit >= self.rules.hit_interval
+
+    def register(self, target: Any) -> bool:
+        """Records a hit on `target`. Returns `False` if it was already hit as many times as allowed."""
+        now = time.monotonic()
+        if not self.can_hit(target, now): return False
+        count, _ = self._hits.get(id(target), (0, 0.0))
+        self._hits[id(target)] = (count + 1, now)
+        return True
@@ -0,0 +1,75 @@
+import asyncio
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable
+
+if TYPE_CHECKING:
+    from entities.entity import Entity
+
+
+# * === EVENTS ===
+@dataclass(frozen=True, slots=True)
+class HitLanded:
+    """An attacker's active attack hitbox has hit the target's hurtbox."""
+    attacker: "Entity"
+    target: "Entity"
+    damage: float
+    attack_phase: int
+    swing_id: int = 0
+
+@dataclass(frozen=True, slots=True)
+class EntityDied:
+    entity: "Entity"
+
+@dataclass(frozen=True, slots=True)
+class Spawned:
+    entity: "Entity"
+
+@dataclass(frozen=True, slots=True)
+class Panned:
+    """
+    The stage has panned by `step` (negative when panning to the right).\n
+    Dispatched before the pan's stage update, but subscribers must update the controls they mount
+    from deferred work (i.e.: timers), as those run after it.
+    """
+    step: float
+
+# * === EVENT BUS ===
+class EventBus:
+    """
+    A lightweight synchronous event bus. Events are queued when published, and then dispatched
+    in bulk once the current tick of the event loop is done (or with `dispatch()`).
+    """
+    def __init__(self):
+        self._handlers: dict[type, list[Callable[[Any], None]]] = {}
+        self._queue: list[Any] = []
+        self._dispatch_scheduled: bool = False
+
+    def subscribe(self, event_type: type, handler: Callable[[Any], None]):
+        """Calls `handler(event)` for every dispatched event of `event_type`. Subscribing twice does nothing."""
+        handlers = self._handlers.setdefault(event_type, [])
+        if handler not in handlers: handlers.append(handler)
+
+    def unsubscribe(self, event_type: type, handler: Callable[[Any], None]):
+        handlers = self._handlers.get(event_type)
+        if handlers and handler in handlers: handlers.remove(handler)
+
+    def publish(self, event: Any):
+        """Queues `event`, and schedules a dispatch if there's a running event loop."""
+        self._queue.append(event)
+        if self._dispatch_scheduled: return
+        try: asyncio.get_running_loop().call_soon(self.dispatch)
+        except RuntimeError: return # ? No running loop, call dispatch() manually
+        self._dispatch_scheduled = True
+
+    def dispatch(self):
+        """Dispatches all the queued events, including the ones published while dispatching."""
+        self._dispatch_scheduled = False
+        while self._queue:
+            queue, self._queue = self._queue, []
+            for event in queue:
+                for handler in self._handlers.get(type(event), ()):
+                    try: handler(event)
+                    except Exception as e: print(f"[EventBus] Error handling {type(event).__name__}: {e}")
+
+# ? Used by entities that are not given a bus of their own
+default_bus = EventBus()
@@ -1,29 +1,112 @@
-import sys
+import os, sys
 from pathlib import Path
+from typing import Iterable
 
-def get_asset_path(relative_path: str) -> str:
+MODS_ENV = "FLETPLATFORMER_MODS"
+
+def get_base_path() -> Path:
     """
-    Returns the absolute path to an asset, working in both Dev and PyInstaller/Flet build.
+    Returns the root of the assets, working in both Dev and PyInstaller/Flet build.
     Handles the script being nested inside 'src/utilities'.
     """
-    
-    # 1. Get the directory where this script lives (.../src/utilities)
-    # We use .resolve() to get the absolute path, resolving symlinks
-    current_file = Path(__file__).resolve()
-    
-    # 2. Determine the Root
     if getattr(sys, 'frozen', False):
         # CASE: PyInstaller / Flet Build
         # When frozen, files are often extracted to a temp folder (sys._MEIPASS)
         # If you are using 'flet pack', your assets usually end up at the root of this temp folder.
-        base_path = Path(sys._MEIPASS)
-    else:
-        # CASE: Development
-        # Go up two levels: src/utilities -> src
-        base_path = current_file.parent.parent
+        return Path(sys._MEIPASS)
+    # CASE: Development
+    # Go up two levels: src/utilities -> src
+    return Path(__file__).resolve().parent.parent
+
+class AssetResolver:
+    """
+    Resolves relative asset paths (i.e.: `assets/audio/sfx/grunt.wav`) into absolute ones.\n
+    The base path is computed once, and every resolved path is memoized. Overlay roots (i.e.: mods)
+    are searched before the base, in order. Their `assets` folders (and the base's) are indexed
+    once into a lookup table, so resolving and checking assets never touches the filesystem.
+    Call `refresh()` if assets are added while running.
+    """
+    def __init__(self, overlays: Iterable[str | Path] = (), *, base_path: Path = None):
+        self.base_path: Path = get_base_path() if base_path is None else Path(base_path)
+        self.overlays: list[Path] = [Path(root).resolve() for root in overlays]
+        self._table: dict[str, str] = None
+        self._overridden: set[str] = set()
+        self._dirs: set[str] = set()
+        self._memo: dict[str | Path, str] = {}
+
+    def _build_table(self):
+        """Indexes the assets of every root, the overlays overriding the base."""
+        table: dict[str, str] = {}
+        overridden: set[str] = set()
+        for root in [self.base_path, *reversed(self.overlays)]:
+            assets_dir = root / "assets"
+            if not assets_dir.is_dir(): continue
+            for dirpath, _, filenames in os.walk(assets_dir):
+                for filename in filenames:
+                    path = Path(dirpath) / filename
+                    key = path.relative_to(root).as_posix()
+                    table[key] = str(path)
+                    if root != self.base_path: overridden.add(key)
+                    else: overridden.discard(key)
+        self._table = table
+        self._overridden = overridden
+        self._dirs = {key.rsplit("/", 1)[0] for key in table}
+
+    @property
+    def table(self) -> dict[str, str]:
+        """Relative path -> absolute path, of every indexed asset."""
+        if self._table is None: self._build_table()
+        return self._table
+
+    def resolve(self, relative_path: str | Path) -> str:
+        """Returns the absolute path of an asset (as a str, Flet expects strings, not Path objects)."""
+        path = self._memo.get(relative_path)
+        if path is None:
+            key = Path(relative_path).as_posix()
+            path = self.table.get(key) or str(self.base_path / key)
+            self._memo[relative_path] = path
+        return path
+
+    def exists(self, relative_path: str | Path) -> bool:
+        return Path(relative_path).as_posix() in self.table
+
+    def has_dir(self, relative_dir: str | Path) -> bool:
+        """Returns `True` if there are assets directly in `relative_dir`."""
+        if self._table is None: self._build_table()
+        return Path(relative_dir).as_posix() in self._dirs
 
-    # 3. Join the paths using the / operator
-    full_path = base_path / relative_path
+    def override(self, relative_path: str | Path) -> str | None:
+        """Returns the absolute path of an asset if an overlay replaces it, otherwise `None`."""
+        key = Path(relative_path).as_posix()
+        if self._table is None: self._build_table()
+        return self._table[key] if key in self._overridden else None
 
-    # 4. Return as a string (Flet expects strings, not Path objects)
-    return str(full_path)
\ No newline at end of file
+    def refresh(self):
+        self._table = None
+        self._memo.clear()
+
+def _get_mod_roots() -> list[str]:
+    """Returns the overlay roots, set with the `FLETPLATFORMER_MODS` env var (separated with `os.pathsep`)."""
+    return [root for root in os.environ.get(MODS_ENV, "").split(os.pathsep) if root]
+
+# ? Shared by every asset lookup
+resolver = AssetResolver(_get_mod_roots())
+
+def get_asset_path(relative_path: str | Path) -> str:
+    """
+    Returns the absolute path to an asset, working in both Dev and PyInstaller/Flet build.
+    Paths are resolved by the shared `AssetResolver`, overlays included.
+    """
+    return resolver.resolve(relative_path)
+
+PRESCALED_DIR = "prescaled"
+
+def get_variant_src(src: str, scale: int = 1, *, mirrored: bool = False) -> str:
+    """
+    Returns the `src` of a pre-processed variant of an image (see `tools/prescale_assets.py`).\n
+    i.e.: `images/player/idle_0.png` -> `prescaled/x2/images/player/idle_0.mirrored.png`
+    """
+    path = Path(src)
+    if mirrored: path = path.with_name(f"{path.stem}.mirrored{path.suffix}")
+    if scale != 1: path = Path(PRESCALED_DIR) / f"x{scale}" / path
+    return path.as_posix()
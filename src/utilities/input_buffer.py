@@ -0,0 +1,101 @@
+import asyncio, time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable
+
+from utilities.keyboard_manager import LatencyStats
+
+if TYPE_CHECKING:
+    from entities.state_machine import Action
+
+
+@dataclass(slots=True)
+class BufferedAction:
+    action: "Action"
+    perform: Callable[[], None]
+    ready: Callable[[], bool] | None
+    time: float
+
+@dataclass(slots=True)
+class BufferStats:
+    direct: int = 0     # Performed right away
+    buffered: int = 0   # Pressed while not allowed yet
+    fired: int = 0      # Buffered, then performed once allowed
+    expired: int = 0    # Buffered, but not allowed within the window
+    replaced: int = 0   # Buffered, then replaced by a newer press
+
+    @property
+    def hit_rate(self) -> float:
+        """The ratio of buffered actions that were performed."""
+        return self.fired / self.buffered if self.buffered else 0.0
+
+class InputBuffer:
+    """
+    Keeps an action pressed while it's not allowed (i.e.: the next combo phase, during an attack),
+    and performs it as soon as it's allowed, if that's within `window` seconds. Only the latest
+    press is kept. An action is allowed if `can(action)` (the entity's state machine) and its
+    `ready()` check (if any) both agree.\n
+    Call `update()` whenever the action may have become allowed (i.e.: on state changes, on ticks),
+    `schedule_update()` from callbacks that can't perform actions themselves (i.e.: state hooks).
+    """
+    def __init__(self, can: Callable[["Action"], bool], *, window: float = 0.3):
+        self.can = can
+        self.window = window
+        self.stats = BufferStats()
+        # ? Time from the press to the buffered action being performed
+        self.wait = LatencyStats()
+        self._pending: BufferedAction = None
+        self._update_handle: asyncio.Handle = None
+
+    @property
+    def pending(self) -> "Action | None":
+        return self._pending.action if self._pending is not None else None
+
+    def _allowed(self, action: "Action", ready: Callable[[], bool] | None) -> bool:
+        return self.can(action) and (ready is None or ready())
+
+    def press(self, action: "Action", perform: Callable[[], None], *, ready: Callable[[], bool] = None) -> bool:
+        """Performs `action` if it's allowed, otherwise buffers it. Returns `True` if it was performed."""
+        if self._allowed(action, ready):
+            self.clear()
+            self.stats.direct += 1
+            perform()
+            return True
+        if self._pending is not None: self.stats.replaced += 1
+        self._pending = BufferedAction(action, perform, ready, time.perf_counter())
+        self.stats.buffered += 1
+        return False
+
+    def update(self) -> bool:
+        """Performs the buffered action if it's now allowed, or drops it if expired. Returns `True` if performed."""
+        self._update_handle = None
+        pending = self._pending
+        if pending is None: return False
+        elapsed = time.perf_counter() - pending.time
+        if elapsed > self.window:
+            self._pending = None
+            self.stats.expired += 1
+            return False
+        if not self._allowed(pending.action, pending.ready): return False
+        self._pending = None
+        self.stats.fired += 1
+        self.wait.record(elapsed)
+        pending.perform()
+        return True
+
+    def schedule_update(self):
+        """Runs `update()` on the next iteration of the event loop, if an action is buffered."""
+        if self._pending is None or self._update_handle is not None: return
+        try: self._update_handle = asyncio.get_running_loop().call_soon(self.update)
+        except RuntimeError: pass
+
+    def clear(self):
+        if self._update_handle is not None: self._update_handle.cancel()
+        self._update_handle = None
+        self._pending = None
+
+    def summary(self) -> str:
+        s = self.stats
+        return (
+            f"{s.direct} direct, {s.buffered} buffered ({s.fired} fired, {s.expired} expired, "
+            f"{s.replaced} replaced, {s.hit_rate:.0%} hit) | wait: {self.wait.summary()}"
+        )
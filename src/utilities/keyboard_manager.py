@@ -1,29 +1,176 @@
-from pynput import keyboard
-
-# A set to keep track of what is currently pressed
-held_keys: set[str | keyboard.KeyCode] = set()
-
-# Setup Pynput Listeners (Non-blocking)
-def on_press(key: keyboard.KeyCode):
-    """Registers pressed keys in the `held_keys` set."""
-    try:
-        # Handle standard keys (a, b, c)
-        held_keys.add(key.char.lower())
-    except AttributeError:
-        # Handle special keys (space, enter, arrow keys)
-        held_keys.add(key)
-        
-def on_release(key: keyboard.KeyCode):
-    """Removes released keys in the `held_keys` set."""
-    try:
-        if hasattr(key, 'char') and key.char.lower() in held_keys:
-            held_keys.remove(key.char.lower())
-        elif key in held_keys:
-            held_keys.remove(key)
-    except KeyError:
-        pass # Key was already removed or never added
-
-def start():
+import asyncio, queue, statistics, time
+from collections import deque
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Callable, Mapping
+
+from utilities.lazy_import import lazy_import
+
+if TYPE_CHECKING:
+    from pynput import keyboard
+
+# ? Only loaded once the listener is started
+pynput = lazy_import("pynput")
+
+# ? Standard keys are lowered chars (a, b, c), special keys are `keyboard.Key` (space, shift, ...)
+InputKey = "str | keyboard.Key | keyboard.KeyCode"
+
+def normalize_key(key: "keyboard.Key | keyboard.KeyCode") -> InputKey:
+    try: return key.char.lower()
+    except AttributeError: return key # ? Special keys, or keys without a char
+
+@dataclass(frozen=True, slots=True)
+class InputEvent:
+    key: InputKey
+    pressed: bool
+    time: float # ? `time.perf_counter()` of when the listener received it
+
+@dataclass(frozen=True, slots=True)
+class InputSnapshot:
+    """
+    The state of the keyboard for a tick, immutable.\n
+    `pressed` and `released` are the keys that went down or up since the previous tick (a key
+    tapped within a tick is in both). `held_for` is how long the held keys have been held, and
+    how long the released ones were held before their release.
+    """
+    tick: int = 0
+    time: float = 0.0
+    held: frozenset[InputKey] = frozenset()
+    pressed: frozenset[InputKey] = frozenset()
+    released: frozenset[InputKey] = frozenset()
+    held_for: Mapping[InputKey, float] = field(default_factory=lambda: MappingProxyType({}))
+
+    def __contains__(self, key: InputKey) -> bool:
+        return key in self.held
+
+    def duration(self, key: InputKey) -> float:
+        return self.held_for.get(key, 0.0)
+
+@dataclass(slots=True)
+class LatencyStats:
+    """The last `window` latencies (in seconds) of an input stage."""
+    window: int = 256
+    samples: deque[float] = field(default_factory=deque)
+    count: int = 0
+
+    def record(self, latency: float):
+        self.samples.append(latency)
+        if len(self.samples) > self.window: self.samples.popleft()
+        self.count += 1
+
+    def summary(self) -> dict[str, float]:
+        """Returns the mean, 95th percentile and max latency of the window, in ms."""
+        if not self.samples: return {"count": self.count}
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "mean_ms": round(statistics.fmean(ordered) * 1000, 2),
+            "p95_ms": round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)] * 1000, 2),
+            "max_ms": round(ordered[-1] * 1000, 2),
+        }
+
+class InputManager:
+    """
+    Collects the keyboard events of the `pynput` listener thread through a thread-safe queue.
+    The queue is only drained on the event loop, which owns the keyboard state.\n
+    - `poll()` returns the snapshot of a tick, for the loops reading the held keys.
+    - `bind()` runs a callback on the event loop as soon as its key is pressed (i.e.: jump, attack).
+
+    Latencies are measured from the listener receiving a press, to its bound action being done
+    (`latency["action"]`), or to the tick that polled it (`latency["tick"]`).
+    """
+    def __init__(self):
+        self._queue: queue.SimpleQueue[InputEvent] = queue.SimpleQueue()
+        self._loop: asyncio.AbstractEventLoop = None
+        self._listener: "keyboard.Listener" = None
+        self._held: dict[InputKey, float] = {}
+        self._pressed: set[InputKey] = set()
+        self._released: dict[InputKey, float] = {}
+        self._press_times: list[float] = []
+        self._bindings: dict[InputKey, list[Callable[[], None]]] = {}
+        self._tick: int = 0
+        self.snapshot: InputSnapshot = InputSnapshot()
+        self.latency: dict[str, LatencyStats] = {"action": LatencyStats(), "tick": LatencyStats()}
+
+    # * === LISTENER THREAD ===
+    def _on_press(self, key: "keyboard.KeyCode"):
+        self._put(InputEvent(normalize_key(key), True, time.perf_counter()))
+
+    def _on_release(self, key: "keyboard.KeyCode"):
+        self._put(InputEvent(normalize_key(key), False, time.perf_counter()))
+
+    def _put(self, event: InputEvent):
+        self._queue.put(event)
+        if self._loop is None: return
+        # ? Wakes the loop, so bound actions don't wait for the next tick
+        try: self._loop.call_soon_threadsafe(self._drain)
+        except RuntimeError: pass # ? The loop is closed
+
+    # * === EVENT LOOP ===
+    def start(self, loop: asyncio.AbstractEventLoop = None):
+        """Starts the listener in a non-blocking way. Bound actions are run on `loop`."""
+        self._loop = loop
+        self._listener = pynput.keyboard.Listener(on_press=self._on_press, on_release=self._on_release)
+        self._listener.start()
+
+    def stop(self):
+        if self._listener is not None: self._listener.stop()
+        self._listener = self._loop = None
+
+    def bind(self, key: InputKey, callback: Callable[[], None]):
+        """Runs `callback` when `key` is pressed (key repeats excluded)."""
+        self._bindings.setdefault(key, []).append(callback)
+
+    def unbind(self, key: InputKey, callback: Callable[[], None]):
+        callbacks = self._bindings.get(key)
+        if callbacks and callback in callbacks: callbacks.remove(callback)
+
+    def _drain(self):
+        """Applies the queued events to the keyboard state, and runs the bound actions."""
+        while True:
+            try: event = self._queue.get_nowait()
+            except queue.Empty: return
+            if event.pressed:
+                if event.key in self._held: continue # ? Key repeat
+                self._held[event.key] = event.time
+                self._pressed.add(event.key)
+                self._press_times.append(event.time)
+                for callback in self._bindings.get(event.key, ()):
+                    callback()
+                    self.latency["action"].record(time.perf_counter() - event.time)
+            else:
+                pressed_at = self._held.pop(event.key, None)
+                if pressed_at is not None: self._released[event.key] = event.time - pressed_at
+
+    def poll(self) -> InputSnapshot:
+        """Returns the snapshot of a new tick, with the events since the previous one."""
+        self._drain()
+        now = time.perf_counter()
+        for pressed_at in self._press_times: self.latency["tick"].record(now - pressed_at)
+        self._tick += 1
+        held_for = {key: now - pressed_at for key, pressed_at in self._held.items()} | self._released
+        self.snapshot = InputSnapshot(
+            self._tick, now, frozenset(self._held), frozenset(self._pressed),
+            frozenset(self._released), MappingProxyType(held_for)
+        )
+        self._pressed.clear()
+        self._released.clear()
+        self._press_times.clear()
+        return self.snapshot
+
+    def latency_summary(self) -> str:
+        return " | ".join(f"{stage}: {stats.summary()}" for stage, stats in self.latency.items())
+
+# ? Shared by the game, and the tests
+input_manager = InputManager()
+
+def load_pynput():
+    """
+    Executes `pynput` on the calling thread. Call it before the listener's thread is started, and
+    before any key is bound, as concurrent first accesses to a lazily imported module aren't safe.
+    """
+    pynput.keyboard
+
+def start(loop: asyncio.AbstractEventLoop = None):
     """Start the listener in a non-blocking way"""
-    listener = keyboard.Listener(on_press=on_press, on_release=on_release)
-    listener.start()
\ No newline at end of file
+    input_manager.start(loop)
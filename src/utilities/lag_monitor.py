@@ -0,0 +1,156 @@
+import asyncio, logging, re, statistics, time
+from collections import Counter, deque
+from typing import Callable
+
+# ? i.e.: "Executing <Task pending name='Goblin.movement_loop' coro=<...>> took 0.123 seconds"
+SLOW_CALLBACK_RE = re.compile(r"Executing (?P<handle>.*) took (?P<duration>[\d.]+) seconds")
+TASK_NAME_RE = re.compile(r"name='(?P<name>[^']+)'")
+
+
+class _Section:
+    """Times a block of code, see `LagMonitor.section()`."""
+    __slots__ = ("_monitor", "name", "_starts")
+
+    def __init__(self, monitor: "LagMonitor", name: str):
+        self._monitor = monitor
+        self.name = name
+        self._starts: list[float] = []
+
+    def __enter__(self):
+        self._starts.append(time.perf_counter())
+        return self
+
+    def __exit__(self, *_):
+        self._monitor.record(self.name, time.perf_counter() - self._starts.pop())
+
+class _SlowCallbackHandler(logging.Handler):
+    """Catches asyncio's slow callback warnings (only logged in debug mode)."""
+    def __init__(self, monitor: "LagMonitor"):
+        super().__init__(logging.WARNING)
+        self._monitor = monitor
+
+    def emit(self, record: logging.LogRecord):
+        match = SLOW_CALLBACK_RE.search(record.getMessage())
+        if match is None: return
+        name = TASK_NAME_RE.search(match["handle"])
+        self._monitor.record_slow_callback(name["name"] if name else match["handle"][:60], float(match["duration"]))
+
+class LagMonitor:
+    """
+    Watches the event loop's health.\n
+    - Measures the scheduled-vs-actual wakeup delay (lag) every `interval` seconds.
+    - Optionally enables asyncio's slow callback detection, and attributes them to their
+      task's name (see `utilities.tasks.name_current_task()`).
+    - Times named sections of code (i.e.: `audio`, `diffs`, `ai`) with `section()`.
+    - Prints a rolling summary every `summary_interval` seconds, if provided.
+    """
+    def __init__(
+        self, *, interval: float = 0.1, window: int = 100, summary_interval: float = None,
+        slow_callback_duration: float = None
+    ):
+        self.interval = interval
+        self.summary_interval = summary_interval
+        self.slow_callback_duration = slow_callback_duration
+        self._lags: deque[float] = deque(maxlen=window)
+        self._slow_callbacks: Counter[str] = Counter()
+        self._slow_time: Counter[str] = Counter()
+        self._section_time: Counter[str] = Counter()
+        self._section_calls: Counter[str] = Counter()
+        self._sections: dict[str, _Section] = {}
+        self._listeners: list[Callable[[float], None]] = []
+        self._handler: _SlowCallbackHandler = None
+        self._probe_handle: asyncio.TimerHandle = None
+        self._summary_handle: asyncio.TimerHandle = None
+        self._window_start: float = time.perf_counter()
+        self._expected_at: float = 0.0
+
+    # * === RECORDING ===
+    def on_sample(self, listener: Callable[[float], None]):
+        """Calls `listener(lag)` with every lag sample (in seconds)."""
+        self._listeners.append(listener)
+
+    def section(self, name: str) -> _Section:
+        """Returns a context manager that adds the time spent in it to the `name` section."""
+        section = self._sections.get(name)
+        if section is None: section = self._sections[name] = _Section(self, name)
+        return section
+
+    def record(self, section: str, seconds: float):
+        self._section_time[section] += seconds
+        self._section_calls[section] += 1
+
+    def record_slow_callback(self, name: str, seconds: float):
+        self._slow_callbacks[name] += 1
+        self._slow_time[name] += seconds
+
+    # * === LIFECYCLE ===
+    def install(self, loop: asyncio.AbstractEventLoop = None):
+        """Starts monitoring `loop` (or the running loop)."""
+        loop = loop or asyncio.get_running_loop()
+        if self.slow_callback_duration is not None:
+            loop.set_debug(True)
+            loop.slow_callback_duration = self.slow_callback_duration
+            self._handler = _SlowCallbackHandler(self)
+            logging.getLogger("asyncio").addHandler(self._handler)
+        self._schedule_probe(loop)
+        if self.summary_interval:
+            self._summary_handle = loop.call_later(self.summary_interval, self._summary_tick, loop)
+
+    def uninstall(self):
+        for handle in (self._probe_handle, self._summary_handle):
+            if handle is not None: handle.cancel()
+        self._probe_handle = self._summary_handle = None
+        if self._handler is not None: logging.getLogger("asyncio").removeHandler(self._handler)
+        self._handler = None
+
+    def _schedule_probe(self, loop: asyncio.AbstractEventLoop):
+        self._expected_at = loop.time() + self.interval
+        self._probe_handle = loop.call_later(self.interval, self._probe, loop)
+
+    def _probe(self, loop: asyncio.AbstractEventLoop):
+        lag = max(0.0, loop.time() - self._expected_at)
+        self._lags.append(lag)
+        for listener in self._listeners:
+            try: listener(lag)
+            except Exception as e: print(f"[LagMonitor] Error in sample listener: {e}")
+        self._schedule_probe(loop)
+
+    def _summary_tick(self, loop: asyncio.AbstractEventLoop):
+        print(self.summary())
+        self.reset_window()
+        self._summary_handle = loop.call_later(self.summary_interval, self._summary_tick, loop)
+
+    # * === REPORTING ===
+    def reset_window(self):
+        """Clears the slow callbacks and section timings (lag samples are rolling)."""
+        self._slow_callbacks.clear()
+        self._slow_time.clear()
+        self._section_time.clear()
+        self._section_calls.clear()
+        self._window_start = time.perf_counter()
+
+    def summary(self) -> str:
+        """Returns a one-line summary of the lag, the slowest callbacks and the section timings."""
+        elapsed = max(time.perf_counter() - self._window_start, 1e-9)
+        parts = ["[LagMonitor]"]
+        if self._lags:
+            lags = sorted(self._lags)
+            p95 = lags[min(len(lags) - 1, int(len(lags) * 0.95))]
+            parts.append(
+                f"lag p50={statistics.median(lags) * 1000:.1f}ms "
+                f"p95={p95 * 1000:.1f}ms max={lags[-1] * 1000:.1f}ms"
+            )
+        if self._section_time:
+            parts.append("| " + ", ".join(
+                f"{name}={seconds * 1000:.1f}ms/{self._section_calls[name]} ({seconds / elapsed:.1%})"
+                for name, seconds in self._section_time.most_common()
+            ))
+        if self._slow_callbacks:
+            parts.append("| slow: " + ", ".join(
+                f"{name} x{count} ({self._slow_time[name] * 1000:.0f}ms)"
+                for name, count in self._slow_callbacks.most_common(3)
+            ))
+        return " ".join(parts)
+
+# ? Shared by the sections timed across the game, installed in `main.py`
+monitor = LagMonitor()
@@ -0,0 +1,18 @@
+import importlib.util, sys
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Returns the module `name`, which is only executed once one of its attributes is accessed.
+    Use it for heavy modules (i.e.: `pygame`, `pynput`) that aren't needed to show the first frame.
+    """
+    if name in sys.modules: return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None: raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
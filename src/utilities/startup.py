@@ -0,0 +1,62 @@
+import json, time
+from pathlib import Path
+
+
+class _Phase:
+    """Times a startup phase, see `StartupReport.phase()`."""
+    __slots__ = ("_report", "name", "_start")
+
+    def __init__(self, report: "StartupReport", name: str):
+        self._report = report
+        self.name = name
+        self._start: float = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *_):
+        self._report.record(self.name, self._start, time.perf_counter())
+
+class StartupReport:
+    """
+    Records how long each startup phase took, relative to `origin`.\n
+    Phases can overlap (i.e.: the mixer is initialized while the UI is built), so each one
+    is reported with its start and end offsets rather than being summed up.
+    """
+    def __init__(self, origin: float = None):
+        self.origin: float = time.perf_counter() if origin is None else origin
+        self.phases: dict[str, tuple[float, float]] = {}
+
+    def phase(self, name: str) -> _Phase:
+        """Returns a context manager that records the time spent in it as the `name` phase."""
+        return _Phase(self, name)
+
+    def record(self, name: str, start: float, end: float):
+        self.phases[name] = (start - self.origin, end - self.origin)
+
+    def mark(self, name: str):
+        """Records a milestone (i.e.: the first frame), as a phase without duration."""
+        now = time.perf_counter()
+        self.record(name, now, now)
+
+    def as_dict(self) -> dict[str, dict[str, float]]:
+        """Returns the phases in ms, i.e.: `{"imports": {"start": 0.0, "end": 812.4, "duration": 812.4}}`."""
+        return {
+            name: {"start": round(start * 1000, 1), "end": round(end * 1000, 1), "duration": round((end - start) * 1000, 1)}
+            for name, (start, end) in self.phases.items()
+        }
+
+    def dump(self, path: str | Path):
+        """Writes the phases (see `as_dict()`) to `path` as JSON, used by `tools/bench_cold_start.py`."""
+        Path(path).write_text(json.dumps(self.as_dict(), indent=2), encoding="utf-8")
+
+    def summary(self) -> str:
+        lines = [f"{'Startup phase':<18}{'Start':>10}{'End':>10}{'Took':>10}"]
+        for name, (start, end) in sorted(self.phases.items(), key=lambda item: item[1]):
+            took = f"{(end - start) * 1000:.1f}" if end > start else "-"
+            lines.append(f"{name:<18}{start * 1000:>10.1f}{end * 1000:>10.1f}{took:>10}")
+        return "\n".join(lines) + "\n(ms)"
+
+# ? Its origin is the first import, so import it before anything else in `main.py`
+startup = StartupReport()
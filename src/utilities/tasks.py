@@ -5,4 +5,12 @@ def attempt_cancel(task: asyncio.Task):
     """
     Cancels task if it's not `None` and is currently running.
     """
-    if task and not task.done(): task.cancel()
\ No newline at end of file
+    if task and not task.done(): task.cancel()
+
+def name_current_task(name: str):
+    """
+    Names the running task, so it's attributed in the slow callback reports (see `LagMonitor`).
+    Tasks started with `page.run_task()` can only be named from the inside.
+    """
+    task = asyncio.current_task()
+    if task is not None: task.set_name(name)
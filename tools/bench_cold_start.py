@@ -0,0 +1,110 @@
+"""
+Cold-start benchmark, from a clean process to the first interactive frame.
+Measures:
+    - Import timings of every module (`python -X importtime`), the slowest ones are listed.
+    - The startup phases recorded by the app (imports, first `page.add`, mixer init, ...).
+    - The wall time until the app exits by itself, after its first interactive frame.
+
+The app is run with `STARTUP_EXIT=1` (exits once ready) and `STARTUP_REPORT=<path>`
+(dumps its startup phases), see `src/main.py`. Both the source and a packaged build
+(`--packaged`) can be measured, and compared against a saved baseline (`--baseline`).
+
+Syntax:
+    bench_cold_start.py [-r REPEATS] [--packaged EXE] [--baseline FILE] [--save-baseline] [--threshold RATIO]
+
+If you want to run this script separately, you can with (if with `uv`):
+    uv run py -m tools.bench_cold_start
+"""
+
+import sys, argparse, json, os, re, statistics, subprocess, tempfile, time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / "src"
+SCRIPT = SRC / "main.py"
+DEFAULT_BASELINE = ROOT / "build" / "cold_start_baseline.json"
+IMPORTTIME_RE = re.compile(r"import time:\s+(?P<self>\d+) \|\s+(?P<cumulative>\d+) \|\s+(?P<module>\S+)")
+
+parser = argparse.ArgumentParser(description="Cold-start benchmark for the source and packaged app.")
+parser.add_argument("-r", "--repeats", type=int, default=3, help="Amount of runs per target (median is kept).")
+parser.add_argument("-t", "--timeout", type=float, default=60, help="Seconds before a run is considered hung.")
+parser.add_argument("--top", type=int, default=15, help="Amount of slowest imports to list.")
+parser.add_argument("--packaged", type=Path, help="Packaged executable to compare against the source run.")
+parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline to compare the results against.")
+parser.add_argument("--save-baseline", action="store_true", help="Save the results as the new baseline.")
+parser.add_argument("--threshold", type=float, default=0.15, help="Allowed slowdown over the baseline (0.15 = 15%%).")
+args = parser.parse_args()
+
+
+def measure_imports() -> list[tuple[str, int, int]]:
+    """Returns `(module, self µs, cumulative µs)` of every module imported by `main.py`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=SRC, capture_output=True, text=True, timeout=args.timeout
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match: imports.append((match["module"], int(match["self"]), int(match["cumulative"])))
+    return imports
+
+def run_once(cmd: list[str], cwd: Path) -> dict[str, float]:
+    """Runs the app until it exits by itself, returns its startup phases (ms) and the wall time."""
+    with tempfile.TemporaryDirectory() as tmp:
+        report = Path(tmp) / "startup.json"
+        env = os.environ | {"STARTUP_EXIT": "1", "STARTUP_REPORT": str(report)}
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=cwd, env=env, capture_output=True, timeout=args.timeout, check=True)
+        wall = (time.perf_counter() - start) * 1000
+        if not report.exists(): raise RuntimeError(f"No startup report was written by: {' '.join(cmd)}")
+        phases = json.loads(report.read_text(encoding="utf-8"))
+    results = {f"{name}.end": phase["end"] for name, phase in phases.items()}
+    results |= {f"{name}.took": phase["duration"] for name, phase in phases.items() if phase["duration"]}
+    results["wall"] = round(wall, 1)
+    return results
+
+def run_target(cmd: list[str], cwd: Path) -> dict[str, float]:
+    """Returns the median of every measurement over `args.repeats` runs."""
+    runs = [run_once(cmd, cwd) for _ in range(args.repeats)]
+    keys = {key for run in runs for key in run}
+    return {key: round(statistics.median(run[key] for run in runs if key in run), 1) for key in sorted(keys)}
+
+def compare(results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]]) -> list[str]:
+    """Returns the measurements that regressed by more than the threshold."""
+    regressions = []
+    for target, measurements in results.items():
+        for key, value in measurements.items():
+            base = baseline.get(target, {}).get(key)
+            if not base or value <= base * (1 + args.threshold): continue
+            regressions.append(f"{target} {key}: {base:.1f}ms -> {value:.1f}ms (+{value / base - 1:.0%})")
+    return regressions
+
+def main():
+    imports = measure_imports()
+    print(f"{'Slowest imports (cumulative)':<48}{'Self (ms)':>12}{'Total (ms)':>12}")
+    for module, self_us, cumulative_us in sorted(imports, key=lambda i: i[2], reverse=True)[:args.top]:
+        print(f"{module:<48}{self_us / 1000:>12.1f}{cumulative_us / 1000:>12.1f}")
+    print()
+
+    results = {"source": run_target([sys.executable, str(SCRIPT)], SRC)}
+    if args.packaged: results["packaged"] = run_target([str(args.packaged)], args.packaged.parent)
+
+    keys = sorted({key for measurements in results.values() for key in measurements})
+    print(f"{'Measurement (ms)':<28}" + "".join(f"{target:>12}" for target in results))
+    for key in keys:
+        print(f"{key:<28}" + "".join(f"{results[target].get(key, float('nan')):>12.1f}" for target in results))
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\n✅ Saved the baseline to {args.baseline}")
+    elif args.baseline.exists():
+        regressions = compare(results, json.loads(args.baseline.read_text(encoding="utf-8")))
+        if regressions:
+            print(f"\n❌ Startup regressed over {args.threshold:.0%}:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+        print(f"\n✅ No startup regression over {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Micro-benchmark for the entity state objects (`EntityStates`, `EntityStats`, `HitboxPos`).
+Compares the slotted dataclasses against equivalent `__dict__` based dataclasses on:
+    - Memory used by `N` entities worth of state objects.
+    - Reading the hot state flags (as done in `_interrupt_action()` and the animation loops).
+    - Resetting the states in place against allocating new instances.
+
+Syntax:
+    bench_entity_state.py [-n ENTITIES] [-r REPEATS]
+
+If you want to run this script separately, you can with (if with `uv`):
+    uv run py -m tools.bench_entity_state
+"""
+
+import sys, argparse, timeit, tracemalloc
+from dataclasses import fields, make_dataclass
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from entities.entity import EntityStates, EntityStats, HitboxPos
+
+parser = argparse.ArgumentParser(description="Entity state objects micro-benchmark.")
+parser.add_argument("-n", "--entities", type=int, default=10_000, help="Amount of entities to simulate.")
+parser.add_argument("-r", "--repeats", type=int, default=5, help="Amount of timing repeats (best is kept).")
+args = parser.parse_args()
+
+
+def unslotted(cls: type) -> type:
+    """Returns a plain (`__dict__` based) dataclass with the same fields as `cls`."""
+    return make_dataclass(f"Dict{cls.__name__}", [(f.name, f.type, f.default) for f in fields(cls)])
+
+def measure_memory(classes: tuple[type, ...], count: int) -> int:
+    """Returns the bytes allocated by `count` instances of every class in `classes`."""
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    instances = [[cls() for cls in classes] for _ in range(count)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del instances
+    return after - before
+
+def measure_flag_reads(states_cls: type, count: int, repeats: int) -> float:
+    """Returns the best time (s) to check the hot flags of `count` states."""
+    states = [states_cls() for _ in range(count)]
+    def check():
+        for s in states:
+            if s.is_attacking or s.jumped or s.taking_damage or s.dead: pass
+    return min(timeit.repeat(check, number=1, repeat=repeats))
+
+def measure_resets(states_cls: type, count: int, repeats: int) -> tuple[float, float]:
+    """Returns the best times (s) to reallocate and to reset in place `count` states."""
+    states = [states_cls() for _ in range(count)]
+    def reallocate():
+        for i in range(count): states[i] = states_cls(dead=True)
+    def reset():
+        for s in states: s.reset(dead=True)
+    realloc_time = min(timeit.repeat(reallocate, number=1, repeat=repeats))
+    reset_time = min(timeit.repeat(reset, number=1, repeat=repeats)) if hasattr(states_cls, "reset") else 0.0
+    return realloc_time, reset_time
+
+def main():
+    count, repeats = args.entities, args.repeats
+    slotted_classes = (EntityStates, EntityStats, HitboxPos)
+    dict_classes = tuple(unslotted(cls) for cls in slotted_classes)
+
+    slotted_mem = measure_memory(slotted_classes, count)
+    dict_mem = measure_memory(dict_classes, count)
+    slotted_reads = measure_flag_reads(EntityStates, count, repeats)
+    dict_reads = measure_flag_reads(dict_classes[0], count, repeats)
+    dict_realloc, _ = measure_resets(dict_classes[0], count, repeats)
+    slotted_realloc, slotted_reset = measure_resets(EntityStates, count, repeats)
+
+    print(f"Entities: {count:,} (best of {repeats})\n")
+    print(f"{'Benchmark':<28}{'__dict__':>14}{'__slots__':>14}{'Gain':>10}")
+    print(f"{'Memory (KiB)':<28}{dict_mem / 1024:>14,.1f}{slotted_mem / 1024:>14,.1f}{dict_mem / slotted_mem:>9.2f}x")
+    print(f"{'Hot flag reads (ms)':<28}{dict_reads * 1e3:>14.3f}{slotted_reads * 1e3:>14.3f}{dict_reads / slotted_reads:>9.2f}x")
+    print(f"{'Reallocate states (ms)':<28}{dict_realloc * 1e3:>14.3f}{slotted_realloc * 1e3:>14.3f}{dict_realloc / slotted_realloc:>9.2f}x")
+    print(f"{'Reset in place (ms)':<28}{'-':>14}{slotted_reset * 1e3:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,9 @@ Automated build script for the app. Use `-h` or `--help` for available flags.
 
 Steps:
     1. Run bump_build.py to update build_number.
-    2. Run Either build or pack with Flet (Including icon).
-    3. Optionally compile installer with Inno Setup (Available only for Flet build).
+    2. Prepare assets (flatten the foreground layers, pre-scale images, render nametags, pack the SFX and images).
+    3. Run Either build or pack with Flet (Including icon).
+    4. Optionally compile installer with Inno Setup (Available only for Flet build).
 
 Syntax:
     build_app.py [OPTIONS]
@@ -35,6 +36,11 @@ TOOLS = ROOT / "tools"
 INSTALLER = ROOT / "installer" / "fletplatformer.iss"
 PYPROJECT = ROOT / "pyproject.toml"
 BUMP_SCRIPT = TOOLS / "bump_build.py"
+FLATTEN_SCRIPT = TOOLS / "flatten_layers.py"
+PRESCALE_SCRIPT = TOOLS / "prescale_assets.py"
+NAMETAGS_SCRIPT = TOOLS / "render_nametags.py"
+AUDIO_BANK_SCRIPT = TOOLS / "build_audio_bank.py"
+ASSET_PACK_SCRIPT = TOOLS / "build_asset_pack.py"
 BUILD_DIR = ROOT / "build" / "windows"
 DIST_DIR = ROOT / "dist"
 ICON_DIR = ROOT / "src" / "assets" / "images" / "icon.ico"
@@ -157,9 +163,18 @@ def main():
     run([sys.executable, str(BUMP_SCRIPT)])
     info = get_build_info()
 
-    # Step 3: Build app (unless skipped)
+    # Step 3: Prepare assets (unless skipped)
+    if not config.no_build:
+        print_section("STEP 2: PREPARE ASSETS")
+        run([sys.executable, str(FLATTEN_SCRIPT)])
+        run([sys.executable, str(PRESCALE_SCRIPT)])
+        run([sys.executable, str(NAMETAGS_SCRIPT)])
+        run([sys.executable, str(AUDIO_BANK_SCRIPT)])
+        run([sys.executable, str(ASSET_PACK_SCRIPT)])
+
+    # Step 4: Build app (unless skipped)
     if not config.no_build and not config.pack:
-        print_section("STEP 2: BUILDING FLET APP FOR WINDOWS")
+        print_section("STEP 3: BUILDING FLET APP FOR WINDOWS")
         build_cmd = ["uv", "run", "flet", "build", "windows", "-v"]
         run(build_cmd)
 
@@ -168,7 +183,7 @@ def main():
         else:
             print_warning("No build directory found after build.")
     elif config.pack:
-        print_section("STEP 2: BUILDING FLET APP FOR WINDOWS WITH PACK")
+        print_section("STEP 3: BUILDING FLET APP FOR WINDOWS WITH PACK")
         build_options = [
             "--icon", ICON_DIR.as_posix(),
             "--name", f"{APP_NAME}.v{info.version}-Win64-Standalone",
@@ -184,9 +199,9 @@ def main():
     else:
         print_info("Skipping app build (--no-build flag used).")
 
-    # Step 4: Build installer (if requested)
+    # Step 5: Build installer (if requested)
     if not config.no_installer and INSTALLER.exists() and not config.pack:
-        print_section("STEP 3: BUILD INSTALLER")
+        print_section("STEP 4: BUILD INSTALLER")
         inno_output_dir = ROOT / "dist" / "installer"
         inno_output_dir.mkdir(parents=True, exist_ok=True)
 
@@ -209,7 +224,7 @@ def main():
     else:
         print_warning("No Inno Setup script found, skipping installer build.")
 
-    # Step 5: Summary
+    # Step 6: Summary
     elapsed = time.perf_counter() - start_time
     print_section("✅ BUILD SUMMARY")
     print_block(f"""
@@ -0,0 +1,52 @@
+"""
+Packs the image assets (including the pre-scaled, flattened and nametag images, and the manifest
+of the flattened images) into a single asset pack (`src/assets/images.pack`, see
+`src/utilities/asset_pack.py`), with a SHA-256 per asset.
+The game then memory-maps the pack, and serves the images it displays straight from it, instead
+of resolving (or extracting, when packaged) every loose file. Packaged builds only ship the pack.
+
+Run this last, after the other asset tools.
+
+If you want to run this script separately, you can with (if with `uv`):
+    uv run py -m tools.build_asset_pack
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / "src"
+ASSETS = SRC / "assets"
+sys.path.insert(0, str(SRC))
+
+from utilities.asset_pack import PACK_SRC, write_pack
+from utilities.file_management import PRESCALED_DIR
+from backgrounds import FLATTENED_MANIFEST
+
+IMAGE_DIRS = ["images", PRESCALED_DIR]
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".gif", ".webp"}
+# ? Read along with the images, the loose files aren't shipped
+EXTRA_SRCS = [FLATTENED_MANIFEST]
+
+
+def main():
+    assets: dict[str, bytes] = {}
+    for image_dir in IMAGE_DIRS:
+        if not (ASSETS / image_dir).is_dir(): continue
+        for path in sorted((ASSETS / image_dir).rglob("*")):
+            if path.suffix.lower() in IMAGE_SUFFIXES:
+                assets[path.relative_to(ASSETS).as_posix()] = path.read_bytes()
+    for src in EXTRA_SRCS:
+        if (ASSETS / src).is_file(): assets[src] = (ASSETS / src).read_bytes()
+
+    output = SRC / PACK_SRC
+    total = write_pack(output, assets)
+    print(f"✅ Packed {len(assets)} image(s) into {output.relative_to(ROOT)} ({total / 1024 / 1024:.1f} MiB)")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
@@ -0,0 +1,58 @@
+"""
+Packs every SFX into a single audio bank (`src/assets/audio/sfx.bank`, see `src/audio/audio_bank.py`).
+The sounds are pre-converted to the mixer's sample format, so the game can hand them
+straight to the mixer instead of opening and decoding each WAV when it's first played.
+
+The game asks the mixer for the bank's format, and ignores the bank if it can't get it (see
+`pygame.mixer.get_init()`). Packaged builds only ship the bank, not the loose SFX.
+
+Syntax:
+    build_audio_bank.py [-f FREQUENCY] [-s SIZE] [-c CHANNELS] [--compress]
+
+If you want to run this script separately, you can with (if with `uv`):
+    uv run py -m tools.build_audio_bank
+"""
+
+import sys, argparse, os
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy") # ? No audio device is needed to convert
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+import pygame
+
+from audio.audio_bank import BANK_SRC, write_bank
+from audio.sfx_data import all_sfx
+
+parser = argparse.ArgumentParser(description="Packs the SFX into a single audio bank.")
+parser.add_argument("-f", "--frequency", type=int, default=44100, help="Mixer frequency.")
+parser.add_argument("-s", "--size", type=int, default=-16, help="Mixer sample size (negative for signed).")
+parser.add_argument("-c", "--channels", type=int, default=2, help="Mixer channels.")
+parser.add_argument("--compress", action="store_true", help="Compress the sounds (zlib), smaller but not zero-copy.")
+args = parser.parse_args()
+
+
+def main():
+    pygame.mixer.init(frequency=args.frequency, size=args.size, channels=args.channels)
+    frequency, size, channels = pygame.mixer.get_init()
+
+    sounds: dict[str, bytes] = {}
+    for sfx_path in all_sfx():
+        key = sfx_path.as_posix()
+        sounds[key] = pygame.mixer.Sound(str(SRC / key)).get_raw()
+
+    output = SRC / BANK_SRC
+    total = write_bank(output, sounds, frequency, size, channels, compress=args.compress)
+    print(f"✅ Packed {len(sounds)} sound(s) ({frequency}Hz, {size}-bit, {channels}ch) into "
+          f"{output.relative_to(ROOT)} ({total / 1024 / 1024:.1f} MiB)")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
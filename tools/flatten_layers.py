@@ -0,0 +1,83 @@
+"""
+Pre-flattens the foreground layers (8 and 10) into a single image, as they pan together.
+The background layers each have their own parallax factor (or move on their own), so none of
+them can be flattened without breaking the parallax.
+The flattened images are named after the content hash of their source layers, so editing
+any of the layers simply results in a new image (stale images are removed). The name of each
+group's image is written to a manifest, so the game looks it up instead of hashing the layers.
+
+Requires Pillow (included in the `dev` dependency group).
+
+If you want to run this script separately, you can with (if with `uv`):
+    uv run py -m tools.flatten_layers
+"""
+
+import hashlib, json, sys
+from pathlib import Path
+from PIL import Image
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / "src"
+ASSETS = SRC / "assets"
+sys.path.insert(0, str(SRC))
+
+from backgrounds import (
+    FOREGROUND_LAYERS, FLATTENED_DIR, FLATTENED_MANIFEST,
+    get_layer_src, group_layers, layer_group_key
+)
+
+
+def layer_group_hash(group: tuple[int, ...]) -> str:
+    """Returns the content hash of a layer group, used as the name of the flattened image."""
+    digest = hashlib.sha256()
+    for index in group:
+        digest.update(f"{index}:".encode())
+        digest.update((ASSETS / get_layer_src(index)).read_bytes())
+    return digest.hexdigest()[:16]
+
+def flatten_group(group: tuple[int, ...]) -> Path:
+    """Composites the layers of `group` (back to front) and saves the result."""
+    output = ASSETS / FLATTENED_DIR / f"{layer_group_hash(group)}.png"
+    if output.exists():
+        print(f"⏩ Layers {group} are already flattened: {output.name}")
+        return output
+
+    layers = [Image.open(ASSETS / get_layer_src(index)).convert("RGBA") for index in group]
+    flattened = layers[0]
+    for layer in layers[1:]:
+        if layer.size != flattened.size:
+            raise ValueError(f"❌ Layer sizes do not match: {flattened.size} != {layer.size}")
+        flattened = Image.alpha_composite(flattened, layer)
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    flattened.save(output, optimize=True)
+    print(f"✅ Flattened layers {group} -> {output.name}")
+    return output
+
+def main():
+    outputs: set[Path] = set()
+    manifest: dict[str, str] = {}
+    for group in group_layers(FOREGROUND_LAYERS):
+        if len(group) < 2: continue
+        output = flatten_group(group)
+        outputs.add(output)
+        manifest[layer_group_key(group)] = output.name
+
+    (ASSETS / FLATTENED_MANIFEST).parent.mkdir(parents=True, exist_ok=True)
+    (ASSETS / FLATTENED_MANIFEST).write_text(json.dumps(manifest, indent=4))
+    print(f"✅ Wrote the manifest of {len(manifest)} flattened group(s)")
+
+    # Remove flattened images whose source layers have since changed
+    flattened_dir = ASSETS / FLATTENED_DIR
+    if flattened_dir.exists():
+        for stale in set(flattened_dir.glob("*.png")) - outputs:
+            stale.unlink()
+            print(f"🗑️  Removed stale flattened image: {stale.name}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
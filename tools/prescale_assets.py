@@ -0,0 +1,62 @@
+"""
+Emits integer-upscaled (nearest-neighbour) copies of the sprites and backgrounds, so the
+client can display them natively instead of scaling them on every frame.
+Sprites also get a mirrored copy, which is used when flipping instead of a negative scale.
+Only images that are missing or older than their source are processed.
+
+Requires Pillow (included in the `dev` dependency group).
+Run this after `flatten_layers.py`, so the flattened backgrounds are also pre-scaled.
+
+If you want to run this script separately, you can with (if with `uv`):
+    uv run py -m tools.prescale_assets
+"""
+
+import sys
+from pathlib import Path
+from PIL import Image, ImageOps
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / "src"
+ASSETS = SRC / "assets"
+sys.path.insert(0, str(SRC))
+
+from utilities.file_management import get_variant_src
+
+SCALE = 2
+SPRITE_DIRS = ["images/player", "images/enemies"]
+BACKGROUND_DIRS = ["images/backgrounds"]
+
+
+def save_variant(image: Image.Image, src: str, *, mirrored: bool = False) -> bool:
+    """Saves the pre-scaled (and optionally mirrored) variant of `src`. Returns `True` if written."""
+    output = ASSETS / get_variant_src(src, SCALE, mirrored=mirrored)
+    if output.exists() and output.stat().st_mtime >= (ASSETS / src).stat().st_mtime: return False
+    if mirrored: image = ImageOps.mirror(image)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    image.save(output, optimize=True)
+    return True
+
+def prescale_dir(src_dir: str, *, mirror: bool) -> int:
+    """Pre-scales every image in `src_dir` (recursively). Returns the amount of files written."""
+    written = 0
+    for path in sorted((ASSETS / src_dir).rglob("*.png")):
+        src = path.relative_to(ASSETS).as_posix()
+        with Image.open(path) as image:
+            scaled = image.resize((image.width * SCALE, image.height * SCALE), Image.Resampling.NEAREST)
+        written += save_variant(scaled, src)
+        if mirror: written += save_variant(scaled, src, mirrored=True)
+    return written
+
+def main():
+    written = 0
+    for src_dir in SPRITE_DIRS: written += prescale_dir(src_dir, mirror=True)
+    for src_dir in BACKGROUND_DIRS: written += prescale_dir(src_dir, mirror=False)
+    print(f"✅ Pre-scaled assets (x{SCALE}) are up to date, {written} file(s) written.")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
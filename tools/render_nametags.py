@@ -0,0 +1,65 @@
+"""
+Pre-renders the outlined nametags of the player and of every enemy name, so the client
+displays a cached bitmap instead of laying out and painting the name as text.
+Names without a pre-rendered nametag fall back to a single outlined `Text` (see `src/hud.py`).
+
+Requires Pillow (included in the `dev` dependency group).
+
+If you want to run this script separately, you can with (if with `uv`):
+    uv run py -m tools.render_nametags
+"""
+
+import sys
+from pathlib import Path
+from PIL import Image, ImageDraw, ImageFont
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / "src"
+ASSETS = SRC / "assets"
+# ? The game's font (see `src/setup.py`), so the bitmaps match the `Text` fallback
+FONT = ASSETS / "font_styles" / "Inter-VariableFont_opsz,wght.ttf"
+sys.path.insert(0, str(SRC))
+
+from hud import NAMETAG_DIR, NAMETAG_SIZE, NAMETAG_OUTLINE, get_nametag_src
+from entities.enemy import EnemyType
+
+PLAYER_NAMES = ["Hero Knight"]
+
+
+def get_names() -> list[str]:
+    """Returns every (unique) name that can be displayed on a nametag."""
+    names = list(PLAYER_NAMES)
+    for enemy in EnemyType: names.extend([enemy.value.name, *enemy.value.names])
+    return list(dict.fromkeys(names))
+
+def render_nametag(name: str, font: ImageFont.FreeTypeFont) -> Image.Image:
+    """Renders `name` in white, with a black outline."""
+    left, top, right, bottom = font.getbbox(name, stroke_width=NAMETAG_OUTLINE)
+    image = Image.new("RGBA", (right - left, bottom - top), (0, 0, 0, 0))
+    ImageDraw.Draw(image).text(
+        (-left, -top), name, font=font, fill="white",
+        stroke_width=NAMETAG_OUTLINE, stroke_fill="black"
+    )
+    return image
+
+def main():
+    font = ImageFont.truetype(FONT, NAMETAG_SIZE)
+    output_dir = ASSETS / NAMETAG_DIR
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    expected = set()
+    for name in get_names():
+        output = ASSETS / get_nametag_src(name)
+        expected.add(output)
+        render_nametag(name, font).save(output, optimize=True)
+
+    for stale in set(output_dir.glob("*.png")) - expected: stale.unlink()
+    print(f"✅ Rendered {len(expected)} nametag(s) to {output_dir.relative_to(ROOT)}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)